@@ -2,19 +2,22 @@
 Main entry point for Core Analytics application.
 """
 import logging
+import logging.config
 import os
 import sys
-
-from core_analytics.control.AppActivityMonitor import AppActivityMonitor
-from apscheduler.schedulers.background import BackgroundScheduler
-from fastapi import FastAPI
-from contextlib import asynccontextmanager
-from apscheduler.triggers.cron import CronTrigger
+import threading
 
 logging.basicConfig(level=logging.DEBUG)
-logging.getLogger("CoreAnalytics").setLevel(logging.DEBUG)
-logging.getLogger("httpx").setLevel(logging.ERROR)
-logging.getLogger("azure.core.pipeline.policies.http_logging_policy").setLevel(logging.ERROR)
+# incremental: only adjust levels, leave handlers attached elsewhere untouched
+logging.config.dictConfig({
+    "version": 1,
+    "incremental": True,
+    "loggers": {
+        "CoreAnalytics": {"level": "DEBUG"},
+        "httpx": {"level": "ERROR"},
+        "azure.core.pipeline.policies.http_logging_policy": {"level": "ERROR"},
+    },
+})
 
 if os.environ.get("REBUILD", "").lower() == "true":
     from core_analytics.command.rebuild import rebuild
@@ -25,22 +28,45 @@ if os.environ.get("REBUILD", "").lower() == "true":
         logging.error(f"Rebuild failed: {e}")
         sys.exit(1)
 
+# 常駐モードでのみ必要な重い依存（Azure SDK・スケジューラ・FastAPI）はリビルド判定の後で読み込む
+from core_analytics.control.AppActivityMonitor import AppActivityMonitor
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from apscheduler.triggers.cron import CronTrigger
+
 report_mode = os.environ.get("REPORT_MODE", "daily_monitor")
 if report_mode == "daily_monitor":
     days_range = 1
 else:
     days_range = 30
 
+# AppActivityMonitor is built on the first tick and reused; each run() computes its own time window and runs one at a time
+_monitor_singleton = None
+_monitor_lock = threading.Lock()
+
+def get_app_activity_monitor() -> AppActivityMonitor:
+    global _monitor_singleton
+    with _monitor_lock:
+        if _monitor_singleton is None:
+            _monitor_singleton = AppActivityMonitor(days_range=days_range)
+        return _monitor_singleton
+
 def run_app_activity_monitor():
     try:
         print("Scheduled job started")
-        app_activity_monitor = AppActivityMonitor(days_range=days_range)
+        app_activity_monitor = get_app_activity_monitor()
         app_activity_monitor.run()
     except Exception as e:
         print(f"Scheduled job failed: {e}")
 
 # スケジューラーを起動
-scheduler = BackgroundScheduler()
+# 重いレポート生成は専用のワーカースレッドで実行し、重複実行・溜まった実行はまとめる
+scheduler = BackgroundScheduler(
+    executors={"default": ThreadPoolExecutor(max_workers=2)},
+    job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300}
+)
 
 if os.environ.get("SCHEDULER_DEBUG_MODE", "0") == "1":
     for seconds in [0, 10, 20, 30, 40, 50]:
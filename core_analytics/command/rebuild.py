@@ -1,9 +1,13 @@
 import datetime
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from zoneinfo import ZoneInfo
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl import Workbook, load_workbook
 
 from core_analytics.config.settings import ConfigurationService
 from core_analytics.model.repositories.azure_log_repository import AzureLogRepository
@@ -11,7 +15,8 @@ from core_analytics.services.analytics_service import AnalyticsService
 from core_analytics.services.query_strategies.strategy_factory import QueryStrategyFactory
 from core_analytics.view.factories.daily_monitor_factory import DailyMonitorFactory
 from core_analytics.core.logging_config import LoggerSetup
-from core_analytics.services.email_service import EmailService
+from core_analytics.core.services import build_services, preflight, REPORT_TEMPLATE_DIR
+from core_analytics.services.singletons import get_email_service
 from core_analytics.model.repositories.azure_blob_repository import AzureBlobRepository
 from core_analytics.core.models import ProcessData
 
@@ -20,10 +25,20 @@ dotenv.load_dotenv()
 
 logger = LoggerSetup.setup_logger()
 
+JST = ZoneInfo("Asia/Tokyo")
+UTC = datetime.UTC
+
+HISTORY_REPORT_BASE_DIR = Path("output/市場GAI打鍵/打鍵詳細履歴")
+
+
+def _to_jst(target_date: datetime.datetime) -> datetime.datetime:
+    """Return target_date in JST, skipping the conversion for dates already tagged with JST."""
+    return target_date if target_date.tzinfo is JST else target_date.astimezone(JST)
+
 
 def parse_date(date_str: str) -> datetime.datetime:
     """Parse date string in YYYYMMDD format to datetime."""
-    return datetime.datetime.strptime(date_str, "%Y%m%d").replace(tzinfo=ZoneInfo("Asia/Tokyo"))
+    return datetime.datetime.strptime(date_str, "%Y%m%d").replace(tzinfo=JST)
 
 
 def generate_date_range(from_date: str, to_date: str) -> List[datetime.datetime]:
@@ -31,75 +46,120 @@ def generate_date_range(from_date: str, to_date: str) -> List[datetime.datetime]
     start = parse_date(from_date)
     end = parse_date(to_date)
     
-    dates = []
-    current = start
-    while current <= end:
-        dates.append(current)
-        current += datetime.timedelta(days=1)
-    
-    return dates
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
 
 
 def initialize_usage_report_from_template(template_path: Path, output_path: Path) -> None:
     """Initialize usage report from template."""
-    shutil.copy2(template_path, output_path)
+    shutil.copyfile(template_path, output_path)
     logger.info(f"Initialized usage report from template: {output_path}")
 
 
-def process_single_day(target_date: datetime.datetime, config_service: ConfigurationService,
-                      log_repository: AzureLogRepository, strategy_factory: QueryStrategyFactory,
-                      analytics_service: AnalyticsService, daily_monitor_factory: DailyMonitorFactory,
-                      storage_service: Optional[AzureBlobRepository] = None, upload_blob: bool = True) -> List[str]:
-    """Process data for a single day and generate reports."""
-    jst = ZoneInfo("Asia/Tokyo")
-    target_date_jst = target_date.astimezone(jst)
+def prepare_history_directories(date_range: List[datetime.datetime]) -> None:
+    """Create the monthly history report directories for all dates in one pass."""
+    for ym_str in {f"{d.year:04d}{d.month:02d}" for d in map(_to_jst, date_range)}:
+        (HISTORY_REPORT_BASE_DIR / ym_str).mkdir(parents=True, exist_ok=True)
+
+
+def get_day_bounds_utc(target_date: datetime.datetime) -> Tuple[datetime.datetime, datetime.datetime]:
+    """Return the start and end of the JST day containing target_date, in UTC."""
+    target_date_jst = _to_jst(target_date)
     
     start_time = target_date_jst.replace(hour=0, minute=0, second=0, microsecond=0)
     end_time = target_date_jst.replace(hour=23, minute=59, second=59, microsecond=999999)
     
-    start_time_utc = start_time.astimezone(datetime.UTC)
-    end_time_utc = end_time.astimezone(datetime.UTC)
-    
-    logger.info(f"Processing date: {target_date_jst.strftime('%Y-%m-%d')} (from {start_time_utc} to {end_time_utc})")
-    
-    processed_data: ProcessData = analytics_service.fetch_and_process_data(
-        start_time_utc,
-        end_time_utc
-    )
-    
-    app_settings = config_service.get_app_settings()
-    output_dir = app_settings.output_base_dir
+    return start_time.astimezone(UTC), end_time.astimezone(UTC)
+
+
+def fetch_day(target_date: datetime.datetime, analytics_service: AnalyticsService) -> ProcessData:
+    """Fetch and process the data for the JST day containing target_date."""
+    start_time_utc, end_time_utc = get_day_bounds_utc(target_date)
+    logger.info(f"Processing date: {_to_jst(target_date).date().isoformat()} (from {start_time_utc} to {end_time_utc})")
+    return analytics_service.fetch_and_process_data(start_time_utc, end_time_utc)
+
+
+def update_usage_report(target_date: datetime.datetime, processed_data: ProcessData,
+                        config_service: ConfigurationService, daily_monitor_factory: DailyMonitorFactory,
+                        usage_workbook: Optional[Workbook] = None) -> Path:
+    """Apply one day to the cumulative usage report.
     
-    generated_files = []
+    The usage report is a single shared workbook where new month sheets are inserted at the front,
+    so days must be applied one at a time in date order.
+    When usage_workbook is given, the usage report is updated in memory and must be saved by the caller.
+    """
+    _, end_time_utc = get_day_bounds_utc(target_date)
+    output_dir = config_service.get_app_settings().output_base_dir
     
     usage_report_path = daily_monitor_factory._generate_cumulative_usage_report(
-        Path(output_dir), processed_data, end_time_utc, None
+        Path(output_dir), processed_data, end_time_utc, None, usage_workbook
     )
     logger.info(f"Updated usage report: {usage_report_path}")
+    return usage_report_path
+
+
+def generate_history_report(target_date: datetime.datetime, processed_data: ProcessData,
+                            daily_monitor_factory: DailyMonitorFactory,
+                            storage_service: Optional[AzureBlobRepository] = None,
+                            upload_blob: bool = True) -> str:
+    """Write (and optionally upload) the history report for one day.
     
-    date_str = target_date_jst.strftime('%Y%m%d')
-    ym_str = target_date_jst.strftime('%Y%m')
-    
-    base_dir = Path("output/市場GAI打鍵/打鍵詳細履歴") / ym_str
-    base_dir.mkdir(parents=True, exist_ok=True)
-    history_report_path = base_dir / f"市場GAI打鍵履歴_{date_str}.xlsx"
-    
-    template_path = Path("./config/report_template/市場GAI打鍵履歴_YYYYMMDD.xlsx")
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template file not found: {template_path}")
+    The monthly history directory must already exist (see prepare_history_directories).
+    History reports are separate files, so days can be generated concurrently.
+    """
+    target_date_jst = _to_jst(target_date)
+    date_str = f"{target_date_jst.year:04d}{target_date_jst.month:02d}{target_date_jst.day:02d}"
     
-    shutil.copy2(template_path, history_report_path)
-    logger.info(f"Created history report from template: {history_report_path}")
+    history_report_path = HISTORY_REPORT_BASE_DIR / date_str[:6] / f"市場GAI打鍵履歴_{date_str}.xlsx"
     
     daily_monitor_factory._fill_history_template_with_data(history_report_path, processed_data)
-    generated_files.append(str(history_report_path))
     logger.info(f"Generated history report: {history_report_path}")
     
     if upload_blob and storage_service:
         storage_service.upload_file(str(history_report_path), str(history_report_path))
         logger.info(f"Uploaded {history_report_path} to blob")
 
-    return generated_files
+    return str(history_report_path)
+
+
+def process_single_day(target_date: datetime.datetime, config_service: ConfigurationService,
+                      log_repository: AzureLogRepository, strategy_factory: QueryStrategyFactory,
+                      analytics_service: AnalyticsService, daily_monitor_factory: DailyMonitorFactory,
+                      storage_service: Optional[AzureBlobRepository] = None, upload_blob: bool = True,
+                      processed_data: Optional[ProcessData] = None,
+                      usage_workbook: Optional[Workbook] = None) -> List[str]:
+    """Process data for a single day and generate reports.
+    
+    The monthly history directory must already exist (see prepare_history_directories).
+    When processed_data is given (e.g. prefetched for the whole rebuild range), no query is issued.
+    When usage_workbook is given, the usage report is updated in memory and must be saved by the caller.
+    """
+    if processed_data is None:
+        processed_data = fetch_day(target_date, analytics_service)
+    
+    update_usage_report(target_date, processed_data, config_service, daily_monitor_factory, usage_workbook)
+    
+    return [generate_history_report(target_date, processed_data, daily_monitor_factory, storage_service, upload_blob)]
+
+
+def _prepare_history_day(target_date: datetime.datetime, analytics_service: AnalyticsService,
+                         daily_monitor_factory: DailyMonitorFactory,
+                         storage_service: Optional[AzureBlobRepository], upload_blob: bool,
+                         processed_data: Optional[ProcessData] = None) -> Tuple[ProcessData, List[str]]:
+    """Thread pool step: fetch the day if needed and write its history report.
+    
+    Returns the processed data so the usage report can be updated afterwards in date order.
+    A failed history report does not prevent the usage report update for that day.
+    """
+    if processed_data is None:
+        processed_data = fetch_day(target_date, analytics_service)
+    
+    try:
+        history_files = [generate_history_report(target_date, processed_data, daily_monitor_factory, storage_service, upload_blob)]
+    except Exception as e:
+        logger.error(f"Failed to generate history report for {target_date.strftime('%Y%m%d')}: {e}")
+        history_files = []
+    
+    return processed_data, history_files
 
 
 def rebuild():
@@ -118,61 +178,81 @@ def rebuild():
     upload_blob = os.environ.get("REBUILD_UPLOAD_BLOB", "true").lower() == "true"
     send_email = os.environ.get("REBUILD_SEND_EMAIL", "true").lower() == "true"
 
-    config_service = ConfigurationService(days_range=1)
-    log_repository = AzureLogRepository(config_service)
-    strategy_factory = QueryStrategyFactory()
-    analytics_service = AnalyticsService(
-        log_repository,
-        config_service,
-        strategy_factory
-    )
-    daily_monitor_factory = DailyMonitorFactory()
-    storage_service: Optional[AzureBlobRepository] = None
-    if upload_blob:
-        storage_service = AzureBlobRepository(config_service)
+    services = build_services(1)
+    config_service = services.config
+    log_repository = services.log_repo
+    strategy_factory = services.strategy_factory
+    analytics_service = services.analytics
+    daily_monitor_factory = services.daily_monitor_factory
+    storage_service: Optional[AzureBlobRepository] = services.storage if upload_blob else None
 
+    email_service = None
     if send_email:
         try:
-            email_service = EmailService()
-            email_enabled = True
+            email_service = get_email_service()
         except Exception as e:
             logger.warning(f"Email service not available: {e}")
-            email_service = None
-            email_enabled = False
-    else:
-        email_service = None
-        email_enabled = False
+    email_enabled = email_service is not None
+    
+    # Templates and blob access are checked once here instead of failing mid-range
+    preflight(services, check_storage=upload_blob)
     
     all_generated_files = []
     
     usage_report_path = Path("output/市場GAI打鍵/市場GAI使用状況.xlsx")
     usage_report_path.parent.mkdir(parents=True, exist_ok=True)
     
-    template_path = Path("./config/report_template/市場GAI使用状況.xlsx")
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template file not found: {template_path}")
+    initialize_usage_report_from_template(REPORT_TEMPLATE_DIR / "市場GAI使用状況.xlsx", usage_report_path)
+    # Keep the usage workbook open for the whole range and save it once at the end
+    usage_workbook = load_workbook(usage_report_path)
     
-    initialize_usage_report_from_template(template_path, usage_report_path)
+    # Read the history template layout once and create every month directory up front
+    daily_monitor_factory._get_history_template_layout()
+    prepare_history_directories(date_range)
     
-    for target_date in date_range:
-        try:
-            files = process_single_day(
+    # Fetch every day up front with batched queries instead of one round-trip per query and day
+    processed_by_day: Dict[datetime.datetime, ProcessData] = {}
+    try:
+        range_start_utc, _ = get_day_bounds_utc(date_range[0])
+        _, range_end_utc = get_day_bounds_utc(date_range[-1])
+        processed_by_day = analytics_service.fetch_and_process_data_range(range_start_utc, range_end_utc)
+    except Exception as e:
+        logger.warning(f"Batched fetch failed, falling back to per-day queries: {e}")
+    
+    prepare_day = partial(
+        _prepare_history_day,
+        analytics_service=analytics_service,
+        daily_monitor_factory=daily_monitor_factory,
+        storage_service=storage_service,
+        upload_blob=upload_blob
+    )
+
+    # Fetching and history reports are dominated by waiting on Azure and write separate files, so fan them out over a thread pool.
+    # The shared usage workbook is then updated one day at a time in date order, which keeps the month sheet order deterministic.
+    max_workers = max(1, min(int(os.environ.get("REBUILD_MAX_WORKERS", "8")), len(date_range)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                prepare_day,
                 target_date,
-                config_service,
-                log_repository,
-                strategy_factory,
-                analytics_service,
-                daily_monitor_factory,
-                storage_service,
-                upload_blob=upload_blob
+                processed_data=processed_by_day.get(get_day_bounds_utc(target_date)[0])
             )
-            
-            history_files = [f for f in files if "打鍵履歴" in f]
-            all_generated_files.extend(history_files)
-            
-        except Exception as e:
-            logger.error(f"Failed to process date {target_date.strftime('%Y%m%d')}: {e}")
-            continue
+            for target_date in date_range
+        ]
+
+        for target_date, future in zip(date_range, futures):
+            try:
+                processed_data, history_files = future.result()
+                all_generated_files.extend(history_files)
+                
+                update_usage_report(target_date, processed_data, config_service, daily_monitor_factory, usage_workbook)
+                
+            except Exception as e:
+                logger.error(f"Failed to process date {target_date.strftime('%Y%m%d')}: {e}")
+                continue
+    
+    usage_workbook.save(usage_report_path)
+    logger.info(f"Saved usage report: {usage_report_path}")
     
     if usage_report_path.exists():
         all_generated_files.append(str(usage_report_path))
@@ -2,19 +2,43 @@
 Centralized configuration management for Core Analytics application.
 """
 import os
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, Any
-from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+from dataclasses import dataclass, field
 
 
-@dataclass
+# libyaml が使える環境では C 実装のローダーを使う
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_yaml_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _load_yaml_cached(path: str) -> Dict[str, Any]:
+    """Parse a YAML file, reusing the previous result until the file's mtime changes."""
+    mtime = os.path.getmtime(path)
+    with _yaml_cache_lock:
+        hit = _yaml_cache.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YAML_LOADER) or {}
+    
+    with _yaml_cache_lock:
+        _yaml_cache[path] = (mtime, data)
+    return data
+
+
+@dataclass(slots=True, frozen=True)
 class WorkspaceConfig:
     """Configuration for a single workspace."""
     workspace_id: str
     name: str
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QueryConfig:
     """Configuration for a single query."""
     query_type: str
@@ -22,13 +46,14 @@ class QueryConfig:
     startswith_keyword: str = ""
     workspace: str = ""
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppSettings:
     """Main application settings."""
     query_days_range: int = 30
     output_base_dir: str = "output"
     stroke_count_dir: str = "output/stroke_count"
-    blob_container_name: str = os.environ.get("AZURE_BLOB_CONTAINER_NAME")
+    # 環境変数はクラス定義時ではなくインスタンス生成時に読む
+    blob_container_name: str = field(default_factory=lambda: os.environ.get("AZURE_BLOB_CONTAINER_NAME"))
 
 
 class ConfigurationService:
@@ -38,14 +63,34 @@ class ConfigurationService:
         self.config_file_path = config_file_path
         self._workspaces = {}
         self._queries = {}
+        self._query_groups: Dict[str, Dict[str, QueryConfig]] = {}
+        self._raw_config: Dict[str, Any] = {}
         self._app_settings = AppSettings(days_range)
         self._load_configurations()
     
     def _load_configurations(self) -> None:
         """Load all configurations from various sources."""
+        self._load_raw_config()
         self._load_workspace_configs()
         self._load_query_configs()
     
+    def _load_raw_config(self) -> bool:
+        """Load the parsed YAML configuration; return True when it changed since the last call."""
+        if not Path(self.config_file_path).exists():
+            raise FileNotFoundError(f"Configuration file not found: {self.config_file_path}")
+        
+        raw_config = _load_yaml_cached(self.config_file_path)
+        if raw_config is self._raw_config:
+            return False
+        self._raw_config = raw_config
+        return True
+    
+    def _refresh_query_configs(self) -> None:
+        """Rebuild query configurations when config.yaml was edited while the process is running."""
+        if self._load_raw_config():
+            self._load_query_configs()
+            self._query_groups.clear()
+    
     def _load_workspace_configs(self) -> None:
         """Load workspace configurations from environment variables."""
 
@@ -74,21 +119,21 @@ class ConfigurationService:
                 )
     
     def _load_query_configs(self) -> None:
-        """Load query configurations from YAML file."""
-        if not Path(self.config_file_path).exists():
-            raise FileNotFoundError(f"Configuration file not found: {self.config_file_path}")
-        
-        with open(self.config_file_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-        
-        queries_config = config.get("queries", {})
+        """Load query configurations from the parsed YAML file."""
+        self._queries = self._build_query_configs(self._raw_config.get("queries", {}))
+    
+    @staticmethod
+    def _build_query_configs(queries_config: Dict[str, Any]) -> Dict[str, QueryConfig]:
+        """Build QueryConfig objects from a YAML query mapping."""
+        result = {}
         for key, query_data in queries_config.items():
-            self._queries[key] = QueryConfig(
+            result[key] = QueryConfig(
                 query_type=query_data["query_type"],
                 contains_keyword=query_data.get("contains_keyword", ""),
                 startswith_keyword=query_data.get("startswith_keyword", ""),
                 workspace=query_data["workspace"]
             )
+        return result
     
     def get_workspace_config(self, workspace_key: str) -> WorkspaceConfig:
         """Get workspace configuration by key."""
@@ -98,12 +143,14 @@ class ConfigurationService:
     
     def get_query_config(self, query_key: str) -> QueryConfig:
         """Get query configuration by key."""
+        self._refresh_query_configs()
         if query_key not in self._queries:
             raise ValueError(f"Query configuration not found: {query_key}")
         return self._queries[query_key]
     
     def get_all_query_configs(self) -> Dict[str, QueryConfig]:
         """Get all query configurations."""
+        self._refresh_query_configs()
         return self._queries.copy()
     
     def get_workspace_id(self, workspace_key: str) -> str:
@@ -124,24 +171,11 @@ class ConfigurationService:
     
     def get_query_configs_by_group(self, group_name: str) -> Dict[str, QueryConfig]:
         """Get query configurations by group name."""
-        if not Path(self.config_file_path).exists():
-            raise FileNotFoundError(f"Configuration file not found: {self.config_file_path}")
-        
-        with open(self.config_file_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-        
-        group_queries = config.get(group_name, {})
-        result = {}
+        self._refresh_query_configs()
+        if group_name not in self._query_groups:
+            self._query_groups[group_name] = self._build_query_configs(self._raw_config.get(group_name, {}))
         
-        for key, query_data in group_queries.items():
-            result[key] = QueryConfig(
-                query_type=query_data["query_type"],
-                contains_keyword=query_data.get("contains_keyword", ""),
-                startswith_keyword=query_data.get("startswith_keyword", ""),
-                workspace=query_data["workspace"]
-            )
-        
-        return result
+        return self._query_groups[group_name].copy()
     
     def get_enabled_query_configs(self) -> Dict[str, QueryConfig]:
         """Get enabled query configurations."""
@@ -5,17 +5,14 @@ import datetime
 from zoneinfo import ZoneInfo
 import logging
 import os
+import threading
+from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
 
-from core_analytics.config.settings import ConfigurationService
-from core_analytics.model.repositories.azure_log_repository import AzureLogRepository
-from core_analytics.services.analytics_service import AnalyticsService
-from core_analytics.services.query_strategies.strategy_factory import QueryStrategyFactory
 from core_analytics.view.factories.report_factory import ReportFactory
-from core_analytics.view.factories.daily_monitor_factory import DailyMonitorFactory
 from core_analytics.core.logging_config import LoggerSetup, CoreAnalyticsException
-from core_analytics.services.email_service import EmailService
-from core_analytics.services.cost_service import AzureCostService
-from core_analytics.model.repositories.azure_blob_repository import AzureBlobRepository
+from core_analytics.core.services import build_services, preflight
+from core_analytics.services.singletons import get_cost_service, get_email_service
 from core_analytics.services.file_cleanup_service import FileCleanupService
 
 from core_analytics.core.models import ProcessData
@@ -27,63 +24,82 @@ class AppActivityMonitor:
         # Setup logging
         self.logger = LoggerSetup.setup_logger()
         
-        # Calculate time range in JST, then convert to UTC for Azure API
-        jst = ZoneInfo("Asia/Tokyo")
-        end_jst = datetime.datetime.now(jst)
-        start_jst = end_jst - datetime.timedelta(days=days_range)
-        self.end_time = end_jst.astimezone(datetime.UTC)
-        self.start_time = start_jst.astimezone(datetime.UTC)
+        self.days_range = days_range
+        # スケジューラーの複数ジョブから同じインスタンスの run() が重なって呼ばれても、パイプラインは1本ずつ実行する
+        self._run_lock = threading.Lock()
         
         # Initialize dependencies
-        self.config_service = ConfigurationService(days_range=days_range)
-        self.log_repository = AzureLogRepository(self.config_service)
-        self.strategy_factory = QueryStrategyFactory()
-        self.analytics_service = AnalyticsService(
-            self.log_repository, 
-            self.config_service, 
-            self.strategy_factory
-        )
+        services = build_services(days_range)
+        self.services = services
+        self.config_service = services.config
+        self.log_repository = services.log_repo
+        self.strategy_factory = services.strategy_factory
+        self.analytics_service = services.analytics
         self.report_factory = ReportFactory()
-        self.daily_monitor_factory = DailyMonitorFactory()
-        self.storage_service = AzureBlobRepository(self.config_service)
+        self.daily_monitor_factory = services.daily_monitor_factory
+        self.storage_service = services.storage
         self.file_cleanup_service = FileCleanupService(self.config_service)
 
-        try:
-            self.email_service = EmailService()
-            self.email_enabled = True
-        except Exception as e:
-            self.logger.warning(f"Email service not available: {e}")
-            self.email_service = None
-            self.email_enabled = False
-
-        try:
-            self.cost_service = AzureCostService()
-            self.cost_enabled = True
-        except Exception as e:
-            self.logger.warning(f"Cost service not available: {e}")
-            self.cost_service = None
-            self.cost_enabled = False
+        # Email / cost services are resolved at the start of each run (see _resolve_optional_services)
+        self.email_service = None
+        self.email_enabled = False
+        self.cost_service = None
+        self.cost_enabled = False
         
         self.logger.info("AppActivityMonitor initialized successfully")
 
+    def _resolve_optional_services(self) -> None:
+        """Resolve the email and cost services, retrying on every run while they are unavailable."""
+        # 一時的な失敗（ネットワーク・トークン・環境変数の読み込み前など）でプロセス終了まで無効にならないよう、毎回再取得を試みる
+        if self.email_service is None:
+            try:
+                self.email_service = get_email_service()
+            except Exception as e:
+                self.logger.warning(f"Email service not available: {e}")
+        self.email_enabled = self.email_service is not None
+
+        if self.cost_service is None:
+            try:
+                self.cost_service = get_cost_service()
+            except Exception as e:
+                self.logger.warning(f"Cost service not available: {e}")
+        self.cost_enabled = self.cost_service is not None
+
+    def _time_window(self) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Return the (start, end) query time range in UTC, ending now."""
+        # Calculate time range in JST, then convert to UTC for Azure API
+        jst = ZoneInfo("Asia/Tokyo")
+        end_jst = datetime.datetime.now(jst)
+        start_jst = end_jst - datetime.timedelta(days=self.days_range)
+        return start_jst.astimezone(datetime.UTC), end_jst.astimezone(datetime.UTC)
+
     def run(self):
         """Main orchestration method - coordinates the entire analytics pipeline."""
+        # The instance is shared across scheduled runs, so the time window stays local to this run
+        with self._run_lock:
+            self._resolve_optional_services()
+            start_time, end_time = self._time_window()
+            self._run_pipeline(start_time, end_time)
+
+    def _run_pipeline(self, start_time: datetime.datetime, end_time: datetime.datetime):
+        """Run the analytics pipeline for one time window."""
         try:
             self.logger.info("Starting Core Analytics pipeline")
-            self.logger.info(f"Processing data from {self.start_time} to {self.end_time}")
+            preflight(self.services)
+            self.logger.info(f"Processing data from {start_time} to {end_time}")
 
             report_mode = os.environ.get("REPORT_MODE", "daily_monitor")
             
             # Fetch and process analytics data
             processed_data : ProcessData = self.analytics_service.fetch_and_process_data(
-                self.start_time, 
-                self.end_time
+                start_time, 
+                end_time
             )
             
             # Setup output directory
             app_settings = self.config_service.get_app_settings()
             if report_mode == "standard":
-                output_dir = f"{app_settings.output_base_dir}/{self.end_time.strftime('%Y%m%d')}"
+                output_dir = f"{app_settings.output_base_dir}/{end_time.strftime('%Y%m%d')}"
                 os.makedirs(output_dir, exist_ok=True)
             elif report_mode == "daily_monitor":
                 output_dir = app_settings.output_base_dir
@@ -92,7 +108,7 @@ class AppActivityMonitor:
 
             if report_mode in ["standard"]:
                 standard_files = self.report_factory.generate_all_reports(
-                    processed_data, output_dir, self.end_time
+                    processed_data, output_dir, end_time
                 )
                 generated_files.extend(standard_files)
                 self.logger.info(f"Generated {len(standard_files)} standard reports")
@@ -107,13 +123,13 @@ class AppActivityMonitor:
                         self.logger.info(f"MTD costs: {mtd_costs}")
                 
                 daily_monitor_files = self.daily_monitor_factory.generate_daily_monitor_report(
-                    processed_data, output_dir, self.end_time, mtd_costs
+                    processed_data, output_dir, end_time, mtd_costs
                 )
                 generated_files.extend(daily_monitor_files)
                 self.logger.info(f"Generated {len(daily_monitor_files)} daily monitor reports")
 
                 if self.email_enabled and daily_monitor_files:
-                    date_str = self.end_time.strftime('%Y年%m月%d日')
+                    date_str = end_time.strftime('%Y年%m月%d日')
                     email_sent = self.email_service.send_daily_monitor_report(
                         daily_monitor_files, date_str
                     )
@@ -122,9 +138,10 @@ class AppActivityMonitor:
                     else:
                         self.logger.error("Failed to send daily monitor report email")
 
-            #store the generated files to blob
-            for file in generated_files:
-                self.storage_service.upload_file(file, file)
+            #store the generated files to blob (uploads are independent, so run them in parallel)
+            if generated_files:
+                with ThreadPoolExecutor(max_workers=min(8, len(generated_files))) as executor:
+                    list(executor.map(lambda file: self.storage_service.upload_file(file, file), generated_files))
 
             #cleanup the old files
             deleted_folders = self.file_cleanup_service.cleanup_old_output_directories(days_threshold=30)
@@ -137,7 +154,7 @@ class AppActivityMonitor:
             # Print summary for user
             print(f"✅ Analytics pipeline completed successfully!")
             print(f"📊 Generated {len(generated_files)} reports in {output_dir}")
-            print(f"📈 Processed data from {self.start_time.strftime('%Y-%m-%d')} to {self.end_time.strftime('%Y-%m-%d')}")
+            print(f"📈 Processed data from {start_time.strftime('%Y-%m-%d')} to {end_time.strftime('%Y-%m-%d')}")
             print(f"Uploaded {len(generated_files)} report files to blob")
             
         except CoreAnalyticsException as e:
@@ -0,0 +1,43 @@
+"""
+Process-wide Azure credential shared by all Azure clients.
+"""
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from azure.identity import DefaultAzureCredential
+
+# 永続トークンキャッシュ名（プロセス再起動後も前回のトークンを再利用する）
+TOKEN_CACHE_NAME = "core_analytics"
+# トークンの永続化: "off"（既定・メモリのみ）/ "encrypted"（OS の暗号化ストレージ）/ "unencrypted"（暗号化できない環境では平文ファイルも許可）
+TOKEN_CACHE_PERSISTENCE_ENV = "AZURE_TOKEN_CACHE_PERSISTENCE"
+
+_credential: Optional["DefaultAzureCredential"] = None
+_credential_lock = threading.Lock()
+
+
+def get_default_credential() -> "DefaultAzureCredential":
+    """Get the shared DefaultAzureCredential so every client uses one credential chain and token cache."""
+    global _credential
+    if _credential is None:
+        # 複数スレッドから同時に初回呼び出しされても資格情報チェーンの初期化は1回だけにする
+        with _credential_lock:
+            if _credential is None:
+                _credential = _create_credential()
+    return _credential
+
+
+def _create_credential() -> "DefaultAzureCredential":
+    from azure.identity import DefaultAzureCredential, TokenCachePersistenceOptions
+    persistence = os.environ.get(TOKEN_CACHE_PERSISTENCE_ENV, "off").lower()
+    if persistence not in ("encrypted", "unencrypted"):
+        return DefaultAzureCredential()
+
+    # 平文ファイルへのフォールバックはアクセストークン・リフレッシュトークンをディスクに残すため、明示的に指定した場合のみ許可する
+    allow_unencrypted = persistence == "unencrypted"
+    if allow_unencrypted:
+        logging.getLogger("CoreAnalytics").warning(f"Azure token cache may be stored unencrypted on disk ({TOKEN_CACHE_PERSISTENCE_ENV}=unencrypted)")
+    cache_options = TokenCachePersistenceOptions(name=TOKEN_CACHE_NAME, allow_unencrypted_storage=allow_unencrypted)
+    return DefaultAzureCredential(cache_persistence_options=cache_options)
@@ -2,7 +2,7 @@
 Abstract interfaces for Core Analytics application.
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 from azure.monitor.query import LogsQueryResult
 
@@ -14,6 +14,11 @@ class ILogRepository(ABC):
         """Fetch logs based on query configurations."""
         pass
     
+    @abstractmethod
+    def fetch_logs_batch(self, query_configs: Dict[str, Any], time_windows: List[Tuple[datetime, datetime]]) -> List[Dict[str, LogsQueryResult]]:
+        """Fetch logs for several time windows in as few requests as possible."""
+        pass
+    
     @abstractmethod
     def validate_log_data(self, log_results: Dict[str, LogsQueryResult]) -> bool:
         """Validate fetched log data."""
@@ -23,8 +28,8 @@ class IReportGenerator(ABC):
     """Interface for report generation."""
     
     @abstractmethod
-    def generate_report(self, data: LogsQueryResult, filepath: str, report_type: str) -> None:
-        """Generate a report from log data."""
+    def generate_report(self, data: LogsQueryResult, filepath: str, report_type: str) -> Any:
+        """Generate a report from log data, returning any aggregate the report was built from."""
         pass
 
 class IStorageService(ABC):
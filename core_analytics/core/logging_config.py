@@ -1,34 +1,67 @@
 """
 Logging configuration for Core Analytics application.
 """
+import json
 import logging
 import logging.handlers
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Dict
+
+# Loggers already configured by LoggerSetup, keyed by name
+_configured_loggers: Dict[str, logging.Logger] = {}
+_setup_lock = threading.Lock()
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line."""
+    
+    def __init__(self, fields: Dict[str, str], datefmt: str = None):
+        super().__init__(datefmt=datefmt)
+        # Output key -> LogRecord attribute
+        self.fields = fields
+    
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = record.getMessage()
+        payload = {"timestamp": self.formatTime(record, self.datefmt)}
+        for key, attribute in self.fields.items():
+            payload[key] = getattr(record, attribute, None)
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
 
 class LoggerSetup:
     """Setup structured logging for the application."""
     
     @staticmethod
     def setup_logger(name: str = "CoreAnalytics", level: str = "INFO") -> logging.Logger:
-        """Setup and return a configured logger."""
-        logger = logging.getLogger(name)
-        
-        if logger.handlers:
+        """Setup and return a configured logger. Repeated calls return the logger configured first."""
+        logger = _configured_loggers.get(name)
+        if logger is not None:
             return logger
         
+        with _setup_lock:
+            logger = logging.getLogger(name)
+            
+            if not logger.handlers:
+                LoggerSetup._configure_logger(logger, level)
+            
+            _configured_loggers[name] = logger
+            return logger
+    
+    @staticmethod
+    def _configure_logger(logger: logging.Logger, level: str) -> None:
+        """Attach console and file handlers to the logger."""
         logger.setLevel(getattr(logging, level.upper()))
         
         # Create console JSON formatter (simplified for monitoring)
-        console_formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s"}',
-            datefmt='%Y-%m-%dT%H:%M:%S'
-        )
+        console_fields = {"level": "levelname", "logger": "name", "message": "message"}
+        console_formatter = JsonFormatter(console_fields, datefmt='%Y-%m-%dT%H:%M:%S')
         
         # Create file JSON formatter (detailed for debugging)
-        file_formatter = logging.Formatter(
-            '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s", "module": "%(module)s", "function": "%(funcName)s", "line": %(lineno)d}',
+        file_formatter = JsonFormatter(
+            {**console_fields, "module": "module", "function": "funcName", "line": "lineno"},
             datefmt='%Y-%m-%dT%H:%M:%S'
         )
         
@@ -43,13 +76,12 @@ class LoggerSetup:
         log_dir.mkdir(exist_ok=True)
         
         file_handler = logging.FileHandler(
-            log_dir / f"core_analytics_{datetime.now().strftime('%Y%m%d')}.log"
+            log_dir / f"core_analytics_{datetime.now().strftime('%Y%m%d')}.log",
+            delay=True
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(file_formatter)
         logger.addHandler(file_handler)
-        
-        return logger
 
 class CoreAnalyticsException(Exception):
     """Base exception for Core Analytics application."""
@@ -1,10 +1,35 @@
-from typing import Dict
-from pydantic import BaseModel, Field, ConfigDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
 from azure.monitor.query import LogsQueryResult
 
 
-class ProcessData(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    user_count_results: Dict[str, LogsQueryResult] = Field(default_factory=dict)
-    stroke_count_results: Dict[str, LogsQueryResult] = Field(default_factory=dict)
-    unknown_results: Dict[str, LogsQueryResult] = Field(default_factory=dict)
\ No newline at end of file
+RESULT_TYPES = ("user_count", "stroke_count", "unknown")
+
+
+def _empty_results() -> Dict[str, Dict[str, Any]]:
+    return {result_type: {} for result_type in RESULT_TYPES}
+
+
+@dataclass(slots=True)
+class ProcessData:
+    # 集計結果の種別（RESULT_TYPES）ごとに query_key -> 結果 を保持
+    results: Dict[str, Dict[str, Any]] = field(default_factory=_empty_results)
+
+    @property
+    def user_count_results(self) -> Dict[str, Any]:
+        return self.results["user_count"]
+
+    @property
+    def stroke_count_results(self) -> Dict[str, Any]:
+        return self.results["stroke_count"]
+
+    @property
+    def unknown_results(self) -> Dict[str, Any]:
+        return self.results["unknown"]
+
+
+def get_row_count(result: Optional[LogsQueryResult]) -> int:
+    """Return the row count of the first table; the SDK already holds rows as a list, so this is O(1)."""
+    if not result or not result.tables:
+        return 0
+    return len(result.tables[0].rows)
@@ -0,0 +1,65 @@
+"""
+Shared dependency wiring for the Core Analytics entry points.
+"""
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+
+from core_analytics.config.settings import ConfigurationService
+from core_analytics.model.repositories.azure_log_repository import AzureLogRepository
+from core_analytics.model.repositories.azure_blob_repository import AzureBlobRepository
+from core_analytics.services.analytics_service import AnalyticsService
+from core_analytics.services.query_strategies.strategy_factory import QueryStrategyFactory
+from core_analytics.services.singletons import get_storage_service
+from core_analytics.view.factories.daily_monitor_factory import DailyMonitorFactory
+
+REPORT_TEMPLATE_DIR = Path("./config/report_template")
+REQUIRED_TEMPLATES = ("市場GAI使用状況.xlsx", "市場GAI打鍵履歴_YYYYMMDD.xlsx")
+
+
+@dataclass(frozen=True)
+class Services:
+    """Services shared by rebuild() and AppActivityMonitor.
+    
+    The email service is not part of the graph: callers resolve it with get_email_service() when they need it,
+    so a missing SendGrid configuration is not cached here and is not touched when email is disabled.
+    """
+    config: ConfigurationService
+    log_repo: AzureLogRepository
+    strategy_factory: QueryStrategyFactory
+    analytics: AnalyticsService
+    daily_monitor_factory: DailyMonitorFactory
+    storage: AzureBlobRepository
+
+
+@functools.lru_cache(maxsize=4)
+def build_services(days_range: int) -> Services:
+    """Build the service graph once per days_range and reuse it for the rest of the process."""
+    config_service = ConfigurationService(days_range=days_range)
+    log_repository = AzureLogRepository(config_service)
+    strategy_factory = QueryStrategyFactory()
+    analytics_service = AnalyticsService(
+        log_repository,
+        config_service,
+        strategy_factory
+    )
+    
+    return Services(
+        config=config_service,
+        log_repo=log_repository,
+        strategy_factory=strategy_factory,
+        analytics=analytics_service,
+        daily_monitor_factory=DailyMonitorFactory(),
+        storage=get_storage_service(config_service)
+    )
+
+
+def preflight(services: Services, check_storage: bool = True) -> None:
+    """Check templates and blob access up front so a broken setup fails before any work is done."""
+    for template_name in REQUIRED_TEMPLATES:
+        template_path = REPORT_TEMPLATE_DIR / template_name
+        if not template_path.is_file():
+            raise FileNotFoundError(f"Template file not found: {template_path}")
+    
+    if check_storage:
+        services.storage.check_container_access()
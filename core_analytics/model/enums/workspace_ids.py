@@ -1,29 +1,30 @@
 from enum import Enum
 import os
-import yaml
 
 
-# 環境名を環境変数や引数で指定（デフォルトはdev）
-env = os.environ.get("ENV")
-print("#"*100)
-print(env)
+class WorkspaceIds(Enum):
+    """ワークスペースIDを保持する環境変数名（値は参照時に環境変数から読む）"""
+    ALM_WORKSPACE_ID = "ALM_WORKSPACE_ID"
+    DOC_WORKSPACE_ID = "DOC_WORKSPACE_ID"
+    BRAIN_WORKSPACE_ID = "BRAIN_WORKSPACE_ID"
+    MA_BOT_WORKSPACE_ID = "MA_BOT_WORKSPACE_ID"
+    MA_WEB_WORKSPACE_ID = "MA_WEB_WORKSPACE_ID"
+    CA_WORKSPACE_ID = "CA_WORKSPACE_ID"
 
-# YAMLファイルを読み込む
-with open("./config/config.yaml", "r", encoding="utf-8") as f:
-    config = yaml.safe_load(f)
+    @property
+    def workspace_id(self) -> str:
+        """環境変数から現在のワークスペースIDを取得"""
+        return get_workspace_id(self.name)
+
+
+def get_workspace_id(name: str) -> str:
+    """ワークスペース名（例: ALM_WORKSPACE_ID）に対応するIDを環境変数から取得"""
+    workspace_id = os.environ.get(WorkspaceIds[name].value)
+    if not workspace_id:
+        raise ValueError(f"環境変数が設定されていません: {WorkspaceIds[name].value}")
+    return workspace_id
 
-class WorkspaceIds(Enum):
-    ALM_WORKSPACE_ID = os.environ.get("ALM_WORKSPACE_ID")
-    DOC_WORKSPACE_ID = os.environ.get("DOC_WORKSPACE_ID")
-    BRAIN_WORKSPACE_ID = os.environ.get("BRAIN_WORKSPACE_ID")
-    MA_BOT_WORKSPACE_ID = os.environ.get("MA_BOT_WORKSPACE_ID")
-    MA_WEB_WORKSPACE_ID = os.environ.get("MA_WEB_WORKSPACE_ID")
-    CA_WORKSPACE_ID = os.environ.get("CA_WORKSPACE_ID")
 
 if __name__ == "__main__":
-    print(WorkspaceIds.ALM_WORKSPACE_ID.value)
-    print(WorkspaceIds.DOC_WORKSPACE_ID.value)
-    print(WorkspaceIds.BRAIN_WORKSPACE_ID.value)
-    print(WorkspaceIds.MA_BOT_WORKSPACE_ID.value)
-    print(WorkspaceIds.MA_WEB_WORKSPACE_ID.value)
-    print(WorkspaceIds.CA_WORKSPACE_ID.value)
+    for workspace in WorkspaceIds:
+        print(os.environ.get(workspace.value))
@@ -1,3 +1,4 @@
+import functools
 from jinja2 import Template
 import yaml
 from pathlib import Path
@@ -5,33 +6,63 @@ from typing import Dict, Any
 import pathlib
 import os
 
+# libyaml が使える環境では C 実装のローダーを使う
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# template_path = Path(__file__).parent.parent.parent / "config" / "kql_templates.yaml"
+_TEMPLATE_PATH = Path("./config/kql_templates.yaml")
+
+
+def _get_templates_mtime() -> float:
+    """テンプレートファイルの更新時刻を取得（stat 1回で存在確認も兼ねる）"""
+    try:
+        return _TEMPLATE_PATH.stat().st_mtime
+    except FileNotFoundError:
+        raise FileNotFoundError(f"テンプレートファイルが見つかりません: {_TEMPLATE_PATH}")
+
+
 def load_kql_templates() -> dict:
-    """KQLテンプレートをYAMLファイルから読み込み"""
-    # template_path = Path(__file__).parent.parent.parent / "config" / "kql_templates.yaml"
-    template_path = Path("./config/kql_templates.yaml")
-    
-    if not template_path.exists():
-        raise FileNotFoundError(f"テンプレートファイルが見つかりません: {template_path}")
-    
-    with open(template_path, "r", encoding="utf-8") as f:
-        templates = yaml.safe_load(f)
+    """KQLテンプレートをYAMLファイルから読み込み（更新時刻が変わるまではキャッシュを返す）"""
+    return _parse_kql_templates(_get_templates_mtime())
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_kql_templates(mtime: float) -> dict:
+    """指定した更新時刻時点のテンプレートファイルを解析（mtime はキャッシュキー）"""
+    with open(_TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        templates = yaml.load(f, Loader=_YAML_LOADER)
     
     return templates
 
 
-def build_kql(query_type: str, contains_keyword: str="", startswith_keyword: str="") -> str:
-    
-    # テンプレートを読み込み
-    templates = load_kql_templates()
+@functools.lru_cache(maxsize=256)
+def _get_template(query_type: str, template_type: str, mtime: float) -> Template:
+    """クエリタイプ・テンプレート種別ごとにコンパイル済みのJinja2テンプレートを返す（テンプレートファイル更新時は作り直す）"""
+    templates = _parse_kql_templates(mtime)
     
     if query_type not in templates:
         available_types = list(templates.keys())
         raise ValueError(f"未知のクエリタイプ: {query_type}. 利用可能: {available_types}")
     
     # テンプレートを取得
-    template_str: str = templates[query_type].get(f"template_{os.getenv('TEMPLATE_TYPE')}")
+    template_str: str = templates[query_type].get(f"template_{template_type}")
+
+    return Template(template_str)
 
-    template = Template(template_str)
+
+def build_kql(query_type: str, contains_keyword: str="", startswith_keyword: str="") -> str:
+    
+    # 同じパラメータのクエリはレンダリング済みの文字列を再利用（TEMPLATE_TYPE・テンプレート更新時刻もキーに含める）
+    # TEMPLATE_TYPE は毎回読む（.env の読み込み前に呼ばれても、その値がキャッシュに残らないようにする）
+    return _render_kql(query_type, contains_keyword, startswith_keyword, os.getenv('TEMPLATE_TYPE'), _get_templates_mtime())
+
+
+@functools.lru_cache(maxsize=256)
+def _render_kql(query_type: str, contains_keyword: str, startswith_keyword: str, template_type: str, mtime: float) -> str:
+    
+    # コンパイル済みテンプレートを取得（TEMPLATE_TYPE ごとにキャッシュ）
+    template = _get_template(query_type, template_type, mtime)
     
     # パラメータを準備
     params = {}
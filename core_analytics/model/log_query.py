@@ -1,6 +1,9 @@
 from typing import Dict, Any
-from azure.monitor.query import LogsQueryResult
-from model.kql_builder import build_kql
+from azure.monitor.query import LogsQueryResult, LogsBatchQuery
+from core_analytics.model.kql_builder import build_kql
+
+# Azure Monitor のバッチAPIは1リクエストあたり最大10クエリ
+MAX_BATCH_QUERIES = 10
 
 class LogQueryModel:
     """Model層: 純粋なデータ取得・加工を担当"""
@@ -13,7 +16,8 @@ class LogQueryModel:
         純粋なデータ取得処理
         Controller層から設定を受け取り、データを返す
         """
-        results = {}
+        keys = []
+        requests = []
         for key, query_config in queries_config.items():
             # クエリを構築
             query = build_kql(
@@ -25,12 +29,18 @@ class LogQueryModel:
             # ワークスペースIDを取得（Controller層から渡される）
             workspace_id = workspace_mapping[query_config["workspace"]]
             
-            # クエリを実行（正しいメソッド名を使用）
-            results[key] = self.logs_query_client.query_workspace(
+            keys.append(key)
+            requests.append(LogsBatchQuery(
                 workspace_id=workspace_id,
                 query=query,
                 timespan=(start_time, end_time)
-            )
+            ))
+        
+        # クエリごとに往復せず、バッチAPIでまとめて実行（失敗したクエリは LogsQueryError として返る）
+        results = {}
+        for offset in range(0, len(requests), MAX_BATCH_QUERIES):
+            responses = self.logs_query_client.query_batch(requests[offset:offset + MAX_BATCH_QUERIES])
+            results.update(zip(keys[offset:offset + MAX_BATCH_QUERIES], responses))
         
         return results
     
@@ -1,17 +1,23 @@
 """
 Azure Blob Repository implementation.
 """
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 import logging
+import mmap
 import os
 
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
-from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
-
 from core_analytics.core.interfaces import IStorageService
+from core_analytics.core.azure_credential import get_default_credential
 from core_analytics.core.logging_config import DataFetchError
 from core_analytics.config.settings import ConfigurationService
 
+if TYPE_CHECKING:
+    # Azure SDK は初回利用時に読み込む（起動時間短縮のため）
+    from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+
+# Files above the SDK's default block size (4 MiB) are uploaded from a memory map
+MMAP_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+
 class AzureBlobRepository(IStorageService):
     """Repository for Azure Blob Storage operations."""
     
@@ -21,16 +27,18 @@ class AzureBlobRepository(IStorageService):
         self._blob_service_client = None
     
     @property
-    def blob_service_client(self) -> BlobServiceClient:
+    def blob_service_client(self) -> "BlobServiceClient":
         """Lazy initialization of Azure Blob Service Client."""
         if self._blob_service_client is None:
             try:
+                from azure.storage.blob import BlobServiceClient
+                
                 connection_string = os.environ.get("AZURE_BLOB_CONNECTION_STRING")
                 if connection_string:
                     self._blob_service_client = BlobServiceClient.from_connection_string(connection_string)
                     self.logger.info("Azure Blob Service Client initialized with connection string")
                 else:
-                    credential = DefaultAzureCredential()
+                    credential = get_default_credential()
                     
                     account_url = f"https://{os.environ['AZURE_STORAGE_ACCOUNT_NAME']}.blob.core.windows.net"
                     self._blob_service_client = BlobServiceClient(account_url=account_url, credential=credential)
@@ -42,7 +50,7 @@ class AzureBlobRepository(IStorageService):
         
         return self._blob_service_client
     
-    def get_blob_client(self, filename: str) -> BlobClient:
+    def get_blob_client(self, filename: str) -> "BlobClient":
         """Get Azure Blob client for specific file."""
         try:
             app_settings = self.config_service.get_app_settings()
@@ -54,7 +62,7 @@ class AzureBlobRepository(IStorageService):
             self.logger.error(f"Failed to get blob client for {filename}: {e}")
             raise DataFetchError(f"Failed to get blob client: {e}")
     
-    def get_container_client(self) -> ContainerClient:
+    def get_container_client(self) -> "ContainerClient":
         """Get Azure Blob container client."""
         try:
             app_settings = self.config_service.get_app_settings()
@@ -63,15 +71,31 @@ class AzureBlobRepository(IStorageService):
             self.logger.error(f"Failed to get container client: {e}")
             raise DataFetchError(f"Failed to get container client: {e}")
     
-    def upload_file(self, local_file_path: str, remote_path: str) -> str:
-        """Upload a file to Azure Blob Storage."""
+    def check_container_access(self) -> None:
+        """Verify credentials and container with a single properties request."""
+        try:
+            self.get_container_client().get_container_properties()
+        except DataFetchError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Blob container is not accessible: {e}")
+            raise DataFetchError(f"Blob container is not accessible: {e}")
+    
+    def upload_file(self, local_file_path: str, remote_path: str, max_concurrency: int = 4) -> str:
+        """Upload a file to Azure Blob Storage, using up to max_concurrency parallel block uploads."""
         try:
             self.logger.info(f"Uploading file {local_file_path} to {remote_path}")
             
             blob_client = self.get_blob_client(remote_path)
             
             with open(local_file_path, "rb") as data:
-                blob_client.upload_blob(data, overwrite=True)
+                length = os.fstat(data.fileno()).st_size
+                if length > MMAP_UPLOAD_THRESHOLD:
+                    # 大きなファイルはメモリマップ経由で渡し、ブロックごとの読み込みをページキャッシュから行う
+                    with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        blob_client.upload_blob(mapped, overwrite=True, max_concurrency=max_concurrency, length=length)
+                else:
+                    blob_client.upload_blob(data, overwrite=True, max_concurrency=max_concurrency, length=length)
             
             self.logger.info(f"Successfully uploaded {local_file_path} to {remote_path}")
             return blob_client.url
@@ -83,16 +107,15 @@ class AzureBlobRepository(IStorageService):
             self.logger.error(f"Failed to upload {local_file_path}: {e}")
             raise DataFetchError(f"Failed to upload file: {e}")
     
-    def download_file(self, remote_path: str, local_file_path: str) -> bool:
-        """Download a file from Azure Blob Storage."""
+    def download_file(self, remote_path: str, local_file_path: str, max_concurrency: int = 4) -> bool:
+        """Download a file from Azure Blob Storage, streaming up to max_concurrency ranges in parallel."""
         try:
             self.logger.info(f"Downloading {remote_path} to {local_file_path}")
             
             blob_client = self.get_blob_client(remote_path)
             
             with open(local_file_path, "wb") as download_file:
-                download_stream = blob_client.download_blob()
-                download_file.write(download_stream.readall())
+                blob_client.download_blob(max_concurrency=max_concurrency).readinto(download_file)
             
             self.logger.info(f"Successfully downloaded {remote_path} to {local_file_path}")
             return True
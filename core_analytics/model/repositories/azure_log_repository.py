@@ -1,19 +1,25 @@
 """
 Azure Log Repository implementation.
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
-from azure.monitor.query import LogsQueryResult, LogsQueryClient
-from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+from azure.monitor.query import LogsQueryResult, LogsQueryClient, LogsBatchQuery, LogsQueryError, LogsQueryStatus
 import os
 
 from core_analytics.core.interfaces import ILogRepository
+from core_analytics.core.azure_credential import get_default_credential
 from core_analytics.core.logging_config import DataFetchError, ValidationError
 from core_analytics.config.settings import ConfigurationService
 from core_analytics.model.kql_builder import build_kql
-import traceback
+from core_analytics.core.models import get_row_count
+
+# Azure Monitor accepts at most 10 queries per batch request
+MAX_BATCH_QUERIES = 10
+# Batch requests are independent, so up to this many are kept in flight at once
+MAX_CONCURRENT_BATCHES = 8
 
 class AzureLogRepository(ILogRepository):
     """Repository for fetching logs from Azure Monitor."""
@@ -28,85 +34,126 @@ class AzureLogRepository(ILogRepository):
         """Lazy initialization of Azure Logs Query Client."""
         if self._logs_query_client is None:
             try:
-                credential = DefaultAzureCredential()
+                credential = get_default_credential()
 
                 self._logs_query_client = LogsQueryClient(credential)
                 self.logger.info("Azure Logs Query Client initialized successfully")
             except Exception as e:
-                self.logger.error(f"Failed to initialize Azure Logs Query Client: {e}")
+                self.logger.error("Failed to initialize Azure Logs Query Client: %s", e)
                 raise DataFetchError(f"Failed to initialize Azure client: {e}")
         
         return self._logs_query_client
     
     def fetch_logs(self, query_configs: Dict[str, Any], start_time: datetime, end_time: datetime) -> Dict[str, LogsQueryResult]:
-        """Fetch logs from Azure Monitor based on query configurations."""
-        results = {}
+        """Fetch logs from Azure Monitor based on query configurations.
+
+        All queries are sent through the batch API, so the request count is
+        ceil(len(query_configs) / MAX_BATCH_QUERIES) instead of one per query.
+        """
+        self.logger.info("Starting log fetch for %s queries", len(query_configs))
+        self.logger.info("Time range: %s to %s", start_time, end_time)
+        
+        results = self.fetch_logs_batch(query_configs, [(start_time, end_time)])[0]
         
-        self.logger.info(f"Starting log fetch for {len(query_configs)} queries")
-        self.logger.info(f"Time range: {start_time} to {end_time}")
+        for query_key, result in results.items():
+            if result and result.tables:
+                self.logger.info("Query %s returned %s rows", query_key, get_row_count(result))
+            else:
+                self.logger.warning("Query %s returned no data", query_key)
         
+        self.logger.info("Successfully fetched logs for %s queries", len(results))
+        return results
+    
+    def fetch_logs_batch(self, query_configs: Dict[str, Any], time_windows: List[Tuple[datetime, datetime]]) -> List[Dict[str, LogsQueryResult]]:
+        """Fetch logs for several time windows using the Azure Monitor batch API.
+
+        Returns one result dict per time window, in the same order as ``time_windows``.
+        """
+        self.logger.info("Starting batched log fetch for %s queries over %s time windows", len(query_configs), len(time_windows))
+        
+        # Queries and workspace IDs do not depend on the time window, so resolve them once up front
+        prepared_queries: Dict[str, Tuple[str, str]] = {}
         for query_key, query_config in query_configs.items():
             try:
-                self.logger.debug(f"Processing query: {query_key}")
-                
-                # Build KQL query
-                query = build_kql(
-                    query_type=query_config.query_type,
-                    contains_keyword=query_config.contains_keyword,
-                    startswith_keyword=query_config.startswith_keyword
+                prepared_queries[query_key] = (
+                    build_kql(
+                        query_type=query_config.query_type,
+                        contains_keyword=query_config.contains_keyword,
+                        startswith_keyword=query_config.startswith_keyword
+                    ),
+                    self.config_service.get_workspace_id(query_config.workspace)
                 )
-                
-                # Get workspace ID
-                workspace_id = self.config_service.get_workspace_id(query_config.workspace)
-                
-                self.logger.debug(f"Executing query for workspace {query_config.workspace}: {workspace_id}")
-                
-                # Execute query
-                result = self.logs_query_client.query_workspace(
+            except Exception as e:
+                self.logger.error("Failed to build query %s: %s", query_key, e)
+                raise DataFetchError(f"Failed to fetch logs for {query_key}: {e}")
+        
+        batch_requests = []
+        for window_index, (start_time, end_time) in enumerate(time_windows):
+            for query_key, (query, workspace_id) in prepared_queries.items():
+                batch_requests.append((window_index, query_key, LogsBatchQuery(
                     workspace_id=workspace_id,
                     query=query,
                     timespan=(start_time, end_time)
-                )
-                
-                results[query_key] = result
-                
-                if result and result.tables:
-                    row_count = len(result.tables[0].rows) if result.tables[0].rows else 0
-                    self.logger.info(f"Query {query_key} returned {row_count} rows")
-                else:
-                    self.logger.warning(f"Query {query_key} returned no data")
+                )))
+        
+        results: List[Dict[str, LogsQueryResult]] = [{} for _ in time_windows]
+        chunks = [
+            batch_requests[offset:offset + MAX_BATCH_QUERIES]
+            for offset in range(0, len(batch_requests), MAX_BATCH_QUERIES)
+        ]
+        if not chunks:
+            return results
+        
+        def run_chunk(chunk):
+            return self.logs_query_client.query_batch([request for _, _, request in chunk])
+        
+        # The client is thread-safe and each batch is one HTTPS round-trip, so overlap them
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_BATCHES, len(chunks))) as executor:
+            futures = [executor.submit(run_chunk, chunk) for chunk in chunks]
+            
+            for chunk, future in zip(chunks, futures):
+                try:
+                    responses = future.result()
+                except Exception as e:
+                    self.logger.error("Failed to execute query batch: %s", e, exc_info=True)
+                    raise DataFetchError(f"Failed to fetch logs in batch: {e}")
                 
-            except Exception as e:
-                self.logger.error(f"Failed to execute query {query_key}: {e}")
-                self.logger.error(f"Trace: {traceback.format_exc()}")
-                raise DataFetchError(f"Failed to fetch logs for {query_key}: {e}")
+                for (window_index, query_key, _), response in zip(chunk, responses):
+                    if isinstance(response, LogsQueryError):
+                        self.logger.error("Failed to execute query %s: %s", query_key, response.message)
+                        raise DataFetchError(f"Failed to fetch logs for {query_key}: {response.message}")
+                    if response.status == LogsQueryStatus.PARTIAL:
+                        self.logger.error("Query %s returned partial results: %s", query_key, response.partial_error)
+                        raise DataFetchError(f"Failed to fetch logs for {query_key}: {response.partial_error}")
+                    
+                    results[window_index][query_key] = response
         
-        self.logger.info(f"Successfully fetched logs for {len(results)} queries")
+        self.logger.info("Successfully fetched logs for %s queries in batch", len(batch_requests))
         return results
     
     def validate_log_data(self, log_results: Dict[str, LogsQueryResult]) -> bool:
         """Validate fetched log data."""
-        self.logger.info(f"Validating log data for {len(log_results)} results")
+        self.logger.info("Validating log data for %s results", len(log_results))
         
         for key, result in log_results.items():
             try:
                 if not result:
-                    self.logger.error(f"No data returned for query: {key}")
+                    self.logger.error("No data returned for query: %s", key)
                     raise ValidationError(f"No data returned for query: {key}")
                 
                 if not hasattr(result, 'tables'):
-                    self.logger.error(f"Invalid result structure for query: {key}")
+                    self.logger.error("Invalid result structure for query: %s", key)
                     raise ValidationError(f"Invalid result structure for query: {key}")
                 
                 if not result.tables:
-                    self.logger.warning(f"No tables in result for query: {key}")
+                    self.logger.warning("No tables in result for query: %s", key)
                     continue
                 
                 # Additional validation can be added here
-                self.logger.debug(f"Validation passed for query: {key}")
+                self.logger.debug("Validation passed for query: %s", key)
                 
             except Exception as e:
-                self.logger.error(f"Validation failed for query {key}: {e}")
+                self.logger.error("Validation failed for query %s: %s", key, e)
                 return False
         
         self.logger.info("All log data validation passed")
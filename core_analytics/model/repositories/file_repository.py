@@ -5,7 +5,8 @@ import os
 import shutil
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from core_analytics.core.logging_config import DataFetchError
@@ -19,104 +20,117 @@ class FileRepository:
     def delete_directory(self, directory_path: str) -> bool:
         """Delete a directory and all its contents."""
         try:
-            if os.path.exists(directory_path):
-                shutil.rmtree(directory_path)
-                self.logger.info(f"Successfully deleted directory: {directory_path}")
-                return True
-            else:
-                self.logger.warning(f"Directory does not exist: {directory_path}")
-                return False
+            shutil.rmtree(directory_path)
+            self.logger.info("Successfully deleted directory: %s", directory_path)
+            return True
+        except FileNotFoundError:
+            self.logger.warning("Directory does not exist: %s", directory_path)
+            return False
         except Exception as e:
-            self.logger.error(f"Failed to delete directory {directory_path}: {e}")
+            self.logger.error("Failed to delete directory %s: %s", directory_path, e)
             return False
     
     def delete_file(self, file_path: str) -> bool:
         """Delete a single file."""
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                self.logger.info(f"Successfully deleted file: {file_path}")
-                return True
-            else:
-                self.logger.warning(f"File does not exist: {file_path}")
-                return False
+            os.remove(file_path)
+            self.logger.info("Successfully deleted file: %s", file_path)
+            return True
+        except FileNotFoundError:
+            self.logger.warning("File does not exist: %s", file_path)
+            return False
         except Exception as e:
-            self.logger.error(f"Failed to delete file {file_path}: {e}")
+            self.logger.error("Failed to delete file %s: %s", file_path, e)
             return False
     
     def get_directory_creation_date(self, directory_path: str) -> Optional[datetime]:
         """Get the creation date of a directory."""
         try:
-            if os.path.exists(directory_path):
-                timestamp = os.path.getctime(directory_path)
-                return datetime.fromtimestamp(timestamp)
-            else:
-                self.logger.warning(f"Directory does not exist: {directory_path}")
-                return None
+            timestamp = os.path.getctime(directory_path)
+            return datetime.fromtimestamp(timestamp)
+        except FileNotFoundError:
+            self.logger.warning("Directory does not exist: %s", directory_path)
+            return None
         except Exception as e:
-            self.logger.error(f"Failed to get creation date for {directory_path}: {e}")
+            self.logger.error("Failed to get creation date for %s: %s", directory_path, e)
             return None
     
     def get_directory_modification_date(self, directory_path: str) -> Optional[datetime]:
         """Get the last modification date of a directory."""
         try:
-            if os.path.exists(directory_path):
-                timestamp = os.path.getmtime(directory_path)
-                return datetime.fromtimestamp(timestamp)
-            else:
-                self.logger.warning(f"Directory does not exist: {directory_path}")
-                return None
+            timestamp = os.path.getmtime(directory_path)
+            return datetime.fromtimestamp(timestamp)
+        except FileNotFoundError:
+            self.logger.warning("Directory does not exist: %s", directory_path)
+            return None
         except Exception as e:
-            self.logger.error(f"Failed to get modification date for {directory_path}: {e}")
+            self.logger.error("Failed to get modification date for %s: %s", directory_path, e)
             return None
     
     def list_directories(self, parent_path: str) -> List[str]:
         """List all directories in the given parent path."""
         try:
-            if not os.path.exists(parent_path):
-                self.logger.warning(f"Parent directory does not exist: {parent_path}")
-                return []
+            # scandir はエントリ種別をディレクトリ読み込み時に取得するため、isdir ごとの stat が不要
+            # シンボリックリンクは辿らない（削除対象がリンク先に及ばないように）
+            with os.scandir(parent_path) as entries:
+                directories = [os.path.join(parent_path, entry.name) for entry in entries if entry.is_dir(follow_symlinks=False)]
             
-            directories = []
-            for item in os.listdir(parent_path):
-                item_path = os.path.join(parent_path, item)
-                if os.path.isdir(item_path):
-                    directories.append(item_path)
-            
-            self.logger.debug(f"Found {len(directories)} directories in {parent_path}")
+            self.logger.debug("Found %s directories in %s", len(directories), parent_path)
             return directories
+        except FileNotFoundError:
+            self.logger.warning("Parent directory does not exist: %s", parent_path)
+            return []
         except Exception as e:
-            self.logger.error(f"Failed to list directories in {parent_path}: {e}")
+            self.logger.error("Failed to list directories in %s: %s", parent_path, e)
             return []
     
     def get_directory_size(self, directory_path: str) -> int:
         """Get the total size of a directory in bytes."""
         try:
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(directory_path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total_size += os.path.getsize(filepath)
-            return total_size
+            return self._scan_directory_size(directory_path)
+        except FileNotFoundError:
+            return 0
         except Exception as e:
-            self.logger.error(f"Failed to get size for directory {directory_path}: {e}")
+            self.logger.error("Failed to get size for directory %s: %s", directory_path, e)
             return 0
     
+    def get_directory_sizes_bulk(self, directory_paths: List[str], max_workers: int = 8) -> Dict[str, int]:
+        """Get the total size of several directories, walking them in parallel."""
+        if not directory_paths:
+            return {}
+        # stat/scandir は GIL を解放するため、ディレクトリ単位でスレッドに分けて走査する
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(directory_paths))) as executor:
+            return dict(zip(directory_paths, executor.map(self.get_directory_size, directory_paths)))
+    
+    def _scan_directory_size(self, directory_path: str) -> int:
+        """Sum file sizes below directory_path using scandir entries (symlinks are not followed)."""
+        total_size = 0
+        with os.scandir(directory_path) as entries:
+            for entry in entries:
+                # 走査中に削除されたエントリ（並行するクリーンアップなど）はスキップし、ディレクトリ全体を 0 にしない
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        total_size += self._scan_directory_size(entry.path)
+                except FileNotFoundError:
+                    continue
+        return total_size
+    
     def directory_exists(self, directory_path: str) -> bool:
         """Check if a directory exists."""
-        return os.path.exists(directory_path) and os.path.isdir(directory_path)
+        return os.path.isdir(directory_path)
     
     def file_exists(self, file_path: str) -> bool:
         """Check if a file exists."""
-        return os.path.exists(file_path) and os.path.isfile(file_path)
+        return os.path.isfile(file_path)
     
     def create_directory(self, directory_path: str) -> bool:
         """Create a directory (including parent directories if needed)."""
         try:
             os.makedirs(directory_path, exist_ok=True)
-            self.logger.info(f"Successfully created directory: {directory_path}")
+            self.logger.info("Successfully created directory: %s", directory_path)
             return True
         except Exception as e:
-            self.logger.error(f"Failed to create directory {directory_path}: {e}")
+            self.logger.error("Failed to create directory %s: %s", directory_path, e)
             return False
@@ -2,11 +2,11 @@
 Analytics service containing business logic for processing analytics data.
 """
 from typing import Dict, Any, List
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 from azure.monitor.query import LogsQueryResult
-from core_analytics.core.models import ProcessData
+from core_analytics.core.models import ProcessData, RESULT_TYPES, get_row_count
 
 from core_analytics.core.interfaces import IAnalyticsService, ILogRepository
 from core_analytics.core.logging_config import CoreAnalyticsException
@@ -34,7 +34,7 @@ class AnalyticsService(IAnalyticsService):
             query_configs = self.config_service.get_enabled_query_configs()
             
             # Fetch raw log data
-            self.logger.info(f"Fetching logs for {len(query_configs)} queries in selected group")
+            self.logger.info("Fetching logs for %s queries in selected group", len(query_configs))
             log_results = self.log_repository.fetch_logs(query_configs, start_time, end_time)
             
             # Validate data
@@ -48,14 +48,50 @@ class AnalyticsService(IAnalyticsService):
             return processed_data
             
         except Exception as e:
-            self.logger.error(f"Failed to fetch and process analytics data: {e}")
+            self.logger.error("Failed to fetch and process analytics data: %s", e)
+            raise
+    
+    def fetch_and_process_data_range(self, start_time: datetime, end_time: datetime, bucket: timedelta = timedelta(days=1)) -> Dict[datetime, ProcessData]:
+        """Fetch and process data for consecutive buckets between start_time and end_time.
+
+        All buckets are fetched with batched requests instead of one round-trip per query and bucket.
+        Returns processed data keyed by the start of each bucket.
+        """
+        self.logger.info("Starting analytics data fetch and processing from %s to %s in %s buckets", start_time, end_time, bucket)
+        
+        try:
+            time_windows = []
+            bucket_start = start_time
+            while bucket_start <= end_time:
+                bucket_end = min(bucket_start + bucket - timedelta(microseconds=1), end_time)
+                time_windows.append((bucket_start, bucket_end))
+                bucket_start += bucket
+            
+            query_configs = self.config_service.get_enabled_query_configs()
+            
+            self.logger.info("Fetching logs for %s queries over %s buckets", len(query_configs), len(time_windows))
+            window_results = self.log_repository.fetch_logs_batch(query_configs, time_windows)
+            
+            processed_by_bucket = {}
+            for (bucket_start, _), log_results in zip(time_windows, window_results):
+                if not self.log_repository.validate_log_data(log_results):
+                    raise CoreAnalyticsException(f"Log data validation failed for bucket starting {bucket_start}")
+                processed_by_bucket[bucket_start] = self.process_analytics_data(log_results)
+            
+            self.logger.info("Analytics data range fetch and processing completed successfully")
+            return processed_by_bucket
+            
+        except Exception as e:
+            self.logger.error("Failed to fetch and process analytics data range: %s", e)
             raise
     
     def process_analytics_data(self, log_results: Dict[str, LogsQueryResult]) -> ProcessData:
         """Process analytics data and categorize results using strategies."""
-        self.logger.info(f"Processing analytics data for {len(log_results)} queries")
+        self.logger.info("Processing analytics data for %s queries", len(log_results))
         
-        processed_data = ProcessData()
+        # 結果はプレーンな dict に直接組み立て、ProcessData は最後に1回だけ生成する
+        results = {result_type: {} for result_type in RESULT_TYPES}
+        unknown_results = results["unknown"]
         
         for query_key, data in log_results.items():
             try:
@@ -64,42 +100,38 @@ class AnalyticsService(IAnalyticsService):
                 if strategy:
                     result = strategy.process(query_key, data)
                     
-                    if result["type"] == "user_count":
-                        processed_data.user_count_results[query_key] = result
-                    elif result["type"] == "stroke_count":
-                        processed_data.stroke_count_results[query_key] = result
-                    else:
-                        processed_data.unknown_results[query_key] = result
+                    # 未知の種別は unknown に振り分ける
+                    results.get(result["type"], unknown_results)[query_key] = result
                         
-                    self.logger.debug(f"Processed {query_key} with {result['type']} strategy")
+                    self.logger.debug("Processed %s with %s strategy", query_key, result['type'])
                 else:
                     # Fallback for unknown query types
-                    processed_data.unknown_results[query_key] = {
+                    unknown_results[query_key] = {
                         "query_key": query_key,
                         "type": "unknown",
                         "data": data,
-                        "metadata": {"row_count": len(data.tables[0].rows) if data.tables else 0}
+                        "metadata": {"row_count": get_row_count(data)}
                     }
-                    self.logger.warning(f"No strategy found for query: {query_key}")
+                    self.logger.warning("No strategy found for query: %s", query_key)
                     
             except Exception as e:
-                self.logger.error(f"Failed to process data for query {query_key}: {e}")
+                self.logger.error("Failed to process data for query %s: %s", query_key, e)
                 # Continue processing other queries
                 continue
         
         self.logger.info(
-            f"Processing completed: "
-            f"{len(processed_data.user_count_results)} user count, "
-            f"{len(processed_data.stroke_count_results)} stroke count, "
-            f"{len(processed_data.unknown_results)} unknown queries"
+            "Processing completed: %s user count, %s stroke count, %s unknown queries",
+            len(results["user_count"]),
+            len(results["stroke_count"]),
+            len(unknown_results)
         )
         
-        return processed_data
+        return ProcessData(results=results)
     
     #TODO: remove this method(unless we need to more reports with more complex logic)
     def generate_reports(self, processed_data: Dict[str, Any], output_dir: str, end_time: datetime) -> List[str]:
         """Generate all required reports from processed data."""
-        self.logger.info(f"Generating reports to directory: {output_dir}")
+        self.logger.info("Generating reports to directory: %s", output_dir)
         
         try:
             from core_analytics.view.factories.report_factory import ReportFactory
@@ -111,9 +143,9 @@ class AnalyticsService(IAnalyticsService):
                 end_time
             )
             
-            self.logger.info(f"Successfully generated {len(generated_files)} reports")
+            self.logger.info("Successfully generated %s reports", len(generated_files))
             return generated_files
             
         except Exception as e:
-            self.logger.error(f"Failed to generate reports: {e}")
+            self.logger.error("Failed to generate reports: %s", e)
             raise
@@ -1,39 +1,94 @@
 import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 import requests
-from azure.identity import DefaultAzureCredential
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core_analytics.core.azure_credential import get_default_credential
+
+ARM_ENDPOINT = "https://management.azure.com"
+ARM_BATCH_API_VERSION = "2020-06-01"
+COST_QUERY_API_VERSION = "2023-03-01"
+TOKEN_REFRESH_MARGIN_SECONDS = 30
+# Cost Management API はスロットリングが厳しいため並列数・リトライ回数は小さく保つ
+MAX_COST_QUERY_WORKERS = 4
+MAX_THROTTLE_RETRIES = 3
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def _cost_query_path(scope: str) -> str:
+    return f"{scope}/providers/Microsoft.CostManagement/query?api-version={COST_QUERY_API_VERSION}"
+
 
 class AzureCostService:
     def __init__(self):
         self.logger = logging.getLogger("CoreAnalytics")
-        self.credential = DefaultAzureCredential()
+        self.credential = get_default_credential()
         self._token: Optional[str] = None
+        self._token_expires_on: float = 0.0
+        self._session = self._create_session()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        # 接続を使い回して TCP/TLS ハンドシェイクを省く。429/5xx は Retry-After に従って再試行する
+        # （Cost Management のクエリは読み取りのみなので POST の再試行も安全）
+        retry = Retry(
+            total=MAX_THROTTLE_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(8, MAX_COST_QUERY_WORKERS), max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
 
     def _get_token(self) -> str:
-        if self._token:
+        # 有効期限の30秒前までは取得済みトークンを再利用する
+        if self._token and time.time() < self._token_expires_on - TOKEN_REFRESH_MARGIN_SECONDS:
             return self._token
         token = self.credential.get_token("https://management.azure.com/.default")
         self._token = token.token
+        self._token_expires_on = token.expires_on
         return self._token
 
-    def _post_query(self, scope: str, payload: Dict) -> Dict:
-        url = f"https://management.azure.com{scope}/providers/Microsoft.CostManagement/query?api-version=2023-03-01"
+    def _post(self, url: str, payload: Dict) -> Dict:
         headers = {
             "Authorization": f"Bearer {self._get_token()}",
             "Content-Type": "application/json"
         }
-        resp = requests.post(url, json=payload, headers=headers, timeout=60)
+        resp = self._session.post(url, json=payload, headers=headers, timeout=60)
         if resp.status_code >= 400:
             raise RuntimeError(f"Cost query failed: {resp.status_code} {resp.text}")
         return resp.json()
 
-    def query_mtd_cost(self,
-                       scope: str,
-                       dimension_name: Optional[str] = None,
-                       dimension_values: Optional[List[str]] = None,
-                       tag_name: Optional[str] = None,
-                       tag_values: Optional[List[str]] = None) -> float:
+    def _post_query(self, scope: str, payload: Dict) -> Dict:
+        return self._post(f"{ARM_ENDPOINT}{_cost_query_path(scope)}", payload)
+
+    def _collect_rows(self, data: Dict, payload: Dict) -> List[List]:
+        """Return the rows of a query response, following properties.nextLink until every page is read."""
+        properties = (data or {}).get("properties", {})
+        rows = list(properties.get("rows", []))
+        next_link = properties.get("nextLink")
+        while next_link:
+            # nextLink には skiptoken 付きの URL が入るので、同じクエリ本文で POST し直す
+            properties = self._post(next_link, payload).get("properties", {})
+            rows.extend(properties.get("rows", []))
+            next_link = properties.get("nextLink")
+        return rows
+
+    def _post_query_paged(self, scope: str, payload: Dict) -> List[List]:
+        return self._collect_rows(self._post_query(scope, payload), payload)
+
+    @staticmethod
+    def _build_mtd_payload(dimension_name: Optional[str] = None,
+                           dimension_values: Optional[List[str]] = None,
+                           tag_name: Optional[str] = None,
+                           tag_values: Optional[List[str]] = None) -> Dict:
         dataset_filter: Dict = {}
         if tag_name and tag_values:
             dataset_filter = {"tags": {"name": tag_name, "operator": "In", "values": tag_values}}
@@ -49,12 +104,71 @@ class AzureCostService:
         }
         if dataset_filter:
             payload["dataset"]["filter"] = dataset_filter
+        return payload
+
+    @staticmethod
+    def _sum_total_cost(rows: List[List]) -> float:
+        # ページ分割された場合も含め、全行の totalCost を合算する
+        return sum(float(row[0]) for row in rows if row)
+
+    def query_mtd_cost(self,
+                       scope: str,
+                       dimension_name: Optional[str] = None,
+                       dimension_values: Optional[List[str]] = None,
+                       tag_name: Optional[str] = None,
+                       tag_values: Optional[List[str]] = None) -> float:
+        payload = self._build_mtd_payload(dimension_name, dimension_values, tag_name, tag_values)
+        return self._sum_total_cost(self._post_query_paged(scope, payload))
+
+    def query_mtd_cost_batch(self, scope: str, filters_by_app: Dict[str, Dict]) -> Dict[str, float]:
+        """Query MTD costs for several apps in one ARM batch request.
+
+        Apps whose batch entry is not a 200 response with rows are left out of the result so the caller can retry them individually.
+        """
+        app_names = list(filters_by_app)
+        payloads = [self._build_mtd_payload(**filters_by_app[app_name]) for app_name in app_names]
+        body = {
+            "requests": [
+                {
+                    "name": str(index),
+                    "httpMethod": "POST",
+                    "url": _cost_query_path(scope),
+                    "content": payload
+                }
+                for index, payload in enumerate(payloads)
+            ]
+        }
+        data = self._post(f"{ARM_ENDPOINT}/batch?api-version={ARM_BATCH_API_VERSION}", body)
+
+        costs: Dict[str, float] = {}
+        for index, response in enumerate(data.get("responses", [])):
+            # name が返らない場合はリクエスト順で対応付ける
+            name = response.get("name", str(index))
+            if not name.isdigit() or int(name) >= len(app_names):
+                continue
+            app_name = app_names[int(name)]
+            status = response.get("httpStatusCode", 0)
+            content = response.get("content") or {}
+            # 202 Accepted（非同期・本文なし）や rows のない応答は 0 円扱いにせず、個別クエリに回す
+            if status != 200 or not content.get("properties", {}).get("rows"):
+                self.logger.warning(f"Batched cost query for {app_name} returned {status} without rows; querying it individually")
+                continue
+            rows = self._collect_rows(content, payloads[int(name)])
+            costs[app_name] = self._sum_total_cost(rows)
+        return costs
 
-        data = self._post_query(scope, payload)
-        rows = data.get("properties", {}).get("rows", [])
-        if rows and len(rows[0]) > 0:
-            return float(rows[0][0])
-        return 0.0
+    def _query_mtd_costs_individually(self, scope: str, filters_by_app: Dict[str, Dict]) -> Dict[str, float]:
+        # アプリごとのクエリは独立しているので並列に投げる（待ち時間は最も遅い1件分になる）
+        costs: Dict[str, float] = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_COST_QUERY_WORKERS, len(filters_by_app))) as executor:
+            futures = {app_name: executor.submit(self.query_mtd_cost, scope, **f) for app_name, f in filters_by_app.items()}
+            for app_name, future in futures.items():
+                try:
+                    costs[app_name] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to query cost for {app_name}: {e}")
+                    costs[app_name] = 0.0
+        return costs
 
     def get_apps_mtd_costs(self, prefixes: List[str] = None) -> Optional[Dict[str, float]]:
         prefixes = prefixes or ["APP1", "APP2", "APP3", "APP4"]
@@ -80,15 +194,30 @@ class AzureCostService:
                 return {"dimension_name": "ResourceGroupName", "dimension_values": [rg]}
             return {}
 
-        costs: Dict[str, float] = {}
+        app_filters = []
         for p in prefixes:
             app_name = os.environ.get(f"{p}_NAME")
             if not app_name:
                 continue
-            f = build_filter(p)
+            app_filters.append((app_name, build_filter(p)))
+
+        costs: Dict[str, float] = {}
+        if not app_filters:
+            return costs
+
+        # まず全アプリ分を1回のバッチリクエストで取得する
+        batched: Dict[str, float] = {}
+        filters_by_app = {app_name: f for app_name, f in app_filters if f}
+        if filters_by_app:
             try:
-                costs[app_name] = self.query_mtd_cost(scope, **f) if f else 0.0
+                batched = self.query_mtd_cost_batch(scope, filters_by_app)
             except Exception as e:
-                self.logger.error(f"Failed to query cost for {app_name}: {e}")
-                costs[app_name] = 0.0
+                self.logger.warning(f"Batched cost query failed, querying apps individually: {e}")
+
+        # バッチで取れなかったアプリは個別に問い合わせる
+        remaining = {app_name: f for app_name, f in filters_by_app.items() if app_name not in batched}
+        individual = self._query_mtd_costs_individually(scope, remaining) if remaining else {}
+
+        for app_name, _ in app_filters:
+            costs[app_name] = batched.get(app_name, individual.get(app_name, 0.0))
         return costs
@@ -3,12 +3,22 @@ Email service for sending reports via SendGrid.
 """
 import os
 import logging
-from typing import List
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import base64
+import gzip
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
 
+# Must be a multiple of 3 so per-chunk base64 output concatenates without padding
+ENCODE_CHUNK_SIZE = 3 * 1024 * 1024
+# Recipients per message; larger lists are split and sent in parallel
+MAX_RECIPIENTS_PER_MESSAGE = 200
+MAX_SEND_WORKERS = 20
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+GZIP_CONTENT_TYPE = 'application/gzip'
+
 class EmailService:
     """Service for sending emails with attachments."""
     
@@ -17,6 +27,8 @@ class EmailService:
         self.sendgrid_api_key = os.environ.get("SENDGRID_API_KEY")
         self.from_email = os.environ.get("FROM_EMAIL", "noreply@company.com")
         self.to_emails = os.environ.get("TO_EMAILS", "").split(",")
+        # 受信側が .gz を展開できる場合のみ有効にする（送信サイズを減らす）
+        self.compress_attachments = os.environ.get("EMAIL_COMPRESS_ATTACHMENTS", "false").lower() == "true"
         
         if not self.sendgrid_api_key:
             raise ValueError("SENDGRID_API_KEY environment variable is required")
@@ -24,7 +36,10 @@ class EmailService:
         self.client = SendGridAPIClient(api_key=self.sendgrid_api_key)
     
     def send_daily_monitor_report(self, file_paths: List[str], date_str: str) -> bool:
-        """Send daily monitor report via email."""
+        """Send daily monitor report via email.
+        
+        Returns False only when no recipient chunk was delivered; partially delivered sends are logged with the undelivered recipients.
+        """
         try:
             subject = f"市場GAI使用状況レポート - {date_str}"
             
@@ -40,56 +55,138 @@ class EmailService:
             </html>
             """
             
-            message = Mail(
-                from_email=self.from_email,
-                to_emails=self.to_emails,
-                subject=subject,
-                html_content=html_content
-            )
-            
-            # Add attachments
+            # Encode each attachment once and reuse it for every recipient chunk
+            attachments = []
+            # 存在しないファイルは _encode_attachment 側で open 失敗として扱う（事前の exists() による stat を省く）
             for file_path in file_paths:
-                if Path(file_path).exists():
-                    self._add_attachment(message, file_path)
+                encoded = self._encode_attachment(file_path)
+                if encoded:
+                    attachments.append(encoded)
             
-            response = self.client.send(message)
+            recipient_chunks = [
+                self.to_emails[i:i + MAX_RECIPIENTS_PER_MESSAGE]
+                for i in range(0, len(self.to_emails), MAX_RECIPIENTS_PER_MESSAGE)
+            ]
             
-            if response.status_code == 202:
-                self.logger.info(f"Daily monitor report email sent successfully to {self.to_emails}")
+            def send_chunk(recipients: List[str]) -> bool:
+                # 1チャンクの失敗で他のチャンクの結果が失われないよう、例外はチャンクごとに処理する
+                try:
+                    message = Mail(
+                        from_email=self.from_email,
+                        to_emails=recipients,
+                        subject=subject,
+                        html_content=html_content
+                    )
+                    for file_name, encoded_file, file_type in attachments:
+                        self._attach_encoded(message, file_name, encoded_file, file_type)
+                    status_code = self.client.send(message).status_code
+                except Exception as e:
+                    self.logger.error(f"Error sending email to {recipients}: {e}")
+                    return False
+                if status_code != 202:
+                    self.logger.error(f"Failed to send email to {recipients}. Status code: {status_code}")
+                    return False
                 return True
+            
+            if len(recipient_chunks) == 1:
+                results = [send_chunk(recipient_chunks[0])]
             else:
-                self.logger.error(f"Failed to send email. Status code: {response.status_code}")
-                return False
+                with ThreadPoolExecutor(max_workers=min(MAX_SEND_WORKERS, len(recipient_chunks))) as executor:
+                    results = list(executor.map(send_chunk, recipient_chunks))
+            
+            delivered = [recipient for chunk, sent in zip(recipient_chunks, results) if sent for recipient in chunk]
+            undelivered = [recipient for chunk, sent in zip(recipient_chunks, results) if not sent for recipient in chunk]
+            if not undelivered:
+                self.logger.info(f"Daily monitor report email sent successfully to {self.to_emails}")
+                return True
+            if delivered:
+                # 一部のチャンクは配信済みなので、失敗扱いにして再送すると二重送信になる。未送信の宛先だけを記録する
+                self.logger.error(f"Daily monitor report email partially sent. Delivered to {delivered}, not delivered to {undelivered}")
+                return True
+            self.logger.error("Failed to send daily monitor report email to any recipient")
+            return False
                 
         except Exception as e:
             self.logger.error(f"Error sending daily monitor report email: {e}")
             return False
     
-    def _add_attachment(self, message: Mail, file_path: str) -> None:
-        """Add file attachment to email message."""
+    @staticmethod
+    def _encode_file_base64(file_path: str) -> str:
+        """Base64-encode a file, reading the raw bytes in fixed-size chunks.
+
+        Only one raw chunk is held at a time; the whole encoded output is still built in memory.
+        """
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            encoded = bytearray(4 * ((size + 2) // 3))
+            chunk = bytearray(ENCODE_CHUNK_SIZE)
+            view = memoryview(chunk)
+            offset = 0
+            while True:
+                # readinto は EOF 前でも短く返ることがあるため、チャンクが埋まるまで読み足す
+                # （3の倍数でない長さで符号化すると途中に = のパディングが入り、添付ファイルが壊れる）
+                filled = 0
+                while filled < ENCODE_CHUNK_SIZE:
+                    read = f.readinto(view[filled:])
+                    if not read:
+                        break
+                    filled += read
+                if not filled:
+                    break
+                # チャンクは EOF 以外では3の倍数なので、連結しても1回で符号化した結果と一致する
+                piece = base64.b64encode(view[:filled])
+                encoded[offset:offset + len(piece)] = piece
+                offset += len(piece)
+                if filled < ENCODE_CHUNK_SIZE:
+                    break
+        del encoded[offset:]
+        return encoded.decode('ascii')
+    
+    @staticmethod
+    def _encode_file_gzip_base64(file_path: str) -> str:
+        """Gzip a file and base64-encode the compressed bytes."""
+        with open(file_path, 'rb') as f:
+            compressed = gzip.compress(f.read(), compresslevel=6)
+        return base64.b64encode(compressed).decode('ascii')
+    
+    def _encode_attachment(self, file_path: str, compress: Optional[bool] = None) -> Optional[Tuple[str, str, str]]:
+        """Return (file name, base64 content, content type) for an attachment, or None if the file cannot be read."""
+        if compress is None:
+            compress = self.compress_attachments
         try:
-            with open(file_path, 'rb') as f:
-                data = f.read()
-            
             file_name = Path(file_path).name
-            encoded_file = base64.b64encode(data).decode()
-            
-            attachment = Attachment(
-                FileContent(encoded_file),
-                FileName(file_name),
-                FileType('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
-                Disposition('attachment')
-            )
-
-            # Ensure multiple attachments are kept
-            try:
-                message.add_attachment(attachment)
-            except AttributeError:
-                # Fallback in case add_attachment is unavailable
-                if hasattr(message, 'attachments') and isinstance(message.attachments, list):
-                    message.attachments.append(attachment)
-                else:
-                    message.attachments = [attachment]
-            
+            if compress:
+                return f"{file_name}.gz", self._encode_file_gzip_base64(file_path), GZIP_CONTENT_TYPE
+            return file_name, self._encode_file_base64(file_path), XLSX_CONTENT_TYPE
+        except FileNotFoundError:
+            self.logger.warning(f"Attachment not found, skipping: {file_path}")
+            return None
         except Exception as e:
-            self.logger.error(f"Error adding attachment {file_path}: {e}")
\ No newline at end of file
+            self.logger.error(f"Error adding attachment {file_path}: {e}")
+            return None
+    
+    def _attach_encoded(self, message: Mail, file_name: str, encoded_file: str,
+                        file_type: str = XLSX_CONTENT_TYPE) -> None:
+        """Add an already encoded file attachment to email message."""
+        attachment = Attachment(
+            FileContent(encoded_file),
+            FileName(file_name),
+            FileType(file_type),
+            Disposition('attachment')
+        )
+
+        # Ensure multiple attachments are kept
+        try:
+            message.add_attachment(attachment)
+        except AttributeError:
+            # Fallback in case add_attachment is unavailable
+            if hasattr(message, 'attachments') and isinstance(message.attachments, list):
+                message.attachments.append(attachment)
+            else:
+                message.attachments = [attachment]
+    
+    def _add_attachment(self, message: Mail, file_path: str, compress: Optional[bool] = None) -> None:
+        """Add file attachment to email message."""
+        encoded = self._encode_attachment(file_path, compress)
+        if encoded:
+            self._attach_encoded(message, *encoded)
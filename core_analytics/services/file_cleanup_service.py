@@ -3,14 +3,14 @@ File Cleanup Service for managing file retention policies.
 """
 import logging
 import os
-import re
 from datetime import datetime, timedelta
-from typing import List, Dict
-from pathlib import Path
+from typing import List, Dict, Tuple
 
 from core_analytics.model.repositories.file_repository import FileRepository
 from core_analytics.config.settings import ConfigurationService
 
+SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
 class FileCleanupService:
     """Service for applying file cleanup business rules."""
     
@@ -38,26 +38,25 @@ class FileCleanupService:
         self.logger.info(f"Cutoff date for cleanup: {cutoff_date.strftime('%Y-%m-%d')}")
         
         deleted_folders = []
-        candidate_directories = self._get_date_based_directories(output_base_dir)
+        # Only directories due for deletion need their size for the log
+        to_delete, to_keep, directory_sizes = self._scan_candidates(output_base_dir, cutoff_date, size_kept=False)
+        
+        for directory_info in to_keep:
+            self.logger.debug(f"Keeping recent directory: {directory_info['path']} "
+                            f"(created: {directory_info['date'].strftime('%Y-%m-%d')})")
         
-        for directory_info in candidate_directories:
+        # Business rule: Delete if older than threshold
+        for directory_info in to_delete:
             directory_path = directory_info['path']
-            directory_date = directory_info['date']
+            directory_size = directory_sizes.get(directory_path, 0)
             
-            # Business rule: Delete if older than threshold
-            if directory_date < cutoff_date:
-                directory_size = self.file_repository.get_directory_size(directory_path)
-                
-                if self.file_repository.delete_directory(directory_path):
-                    deleted_folders.append(directory_path)
-                    self.logger.info(f"Deleted old directory: {directory_path} "
-                                   f"(created: {directory_date.strftime('%Y-%m-%d')}, "
-                                   f"size: {self._format_size(directory_size)})")
-                else:
-                    self.logger.error(f"Failed to delete directory: {directory_path}")
+            if self.file_repository.delete_directory(directory_path):
+                deleted_folders.append(directory_path)
+                self.logger.info(f"Deleted old directory: {directory_path} "
+                               f"(created: {directory_info['date'].strftime('%Y-%m-%d')}, "
+                               f"size: {self._format_size(directory_size)})")
             else:
-                self.logger.debug(f"Keeping recent directory: {directory_path} "
-                                f"(created: {directory_date.strftime('%Y-%m-%d')})")
+                self.logger.error(f"Failed to delete directory: {directory_path}")
         
         self.logger.info(f"Cleanup completed. Deleted {len(deleted_folders)} directories")
         return deleted_folders
@@ -68,16 +67,17 @@ class FileCleanupService:
         Business logic: Only consider directories with date-based names.
         """
         directories = []
-        date_pattern = re.compile(r'^\d{8}$')  # YYYYMMDD pattern
         
         for directory_path in self.file_repository.list_directories(output_dir):
-            directory_name = Path(directory_path).name
+            directory_name = os.path.basename(directory_path)
             
             # Business rule: Only process date-named directories
-            if date_pattern.match(directory_name):
+            if len(directory_name) == 8 and directory_name.isdigit():  # YYYYMMDD pattern
                 try:
                     # Parse date from directory name (business logic)
-                    directory_date = datetime.strptime(directory_name, '%Y%m%d')
+                    directory_date = datetime(
+                        int(directory_name[:4]), int(directory_name[4:6]), int(directory_name[6:8])
+                    )
                     directories.append({
                         'path': directory_path,
                         'name': directory_name,
@@ -91,6 +91,36 @@ class FileCleanupService:
         
         return directories
     
+    def _scan_candidates(self, output_dir: str, cutoff_date: datetime, size_kept: bool = True) -> Tuple[List[Dict], List[Dict], Dict[str, int]]:
+        """
+        Walk the output directory once and split date-named directories by the cutoff date.
+        Returns (to_delete, to_keep, sizes); sizes covers to_delete, plus to_keep when size_kept is set.
+        """
+        to_delete = []
+        to_keep = []
+        
+        for directory_info in self._get_date_based_directories(output_dir):
+            if directory_info['date'] < cutoff_date:
+                to_delete.append(directory_info)
+            else:
+                to_keep.append(directory_info)
+        
+        sized = to_delete + to_keep if size_kept else to_delete
+        directory_sizes = self.file_repository.get_directory_sizes_bulk([info['path'] for info in sized])
+        
+        return to_delete, to_keep, directory_sizes
+    
+    def _summarize_directory(self, directory_info: Dict, directory_sizes: Dict[str, int]) -> Dict:
+        """Build the report entry for a single directory."""
+        directory_size = directory_sizes.get(directory_info['path'], 0)
+        return {
+            'path': directory_info['path'],
+            'name': directory_info['name'],
+            'date': directory_info['date'].strftime('%Y-%m-%d'),
+            'size_bytes': directory_size,
+            'size_formatted': self._format_size(directory_size)
+        }
+    
     #TODO: this is method made for testing, remove it if not needed
     def get_cleanup_report(self, days_threshold: int = 30) -> Dict:
         """
@@ -106,30 +136,11 @@ class FileCleanupService:
             return {"error": f"Output directory does not exist: {output_base_dir}"}
         
         cutoff_date = datetime.now() - timedelta(days=days_threshold)
-        candidate_directories = self._get_date_based_directories(output_base_dir)
-        
-        to_delete = []
-        to_keep = []
-        total_size_to_delete = 0
+        delete_candidates, keep_candidates, directory_sizes = self._scan_candidates(output_base_dir, cutoff_date)
         
-        for directory_info in candidate_directories:
-            directory_path = directory_info['path']
-            directory_date = directory_info['date']
-            directory_size = self.file_repository.get_directory_size(directory_path)
-            
-            directory_summary = {
-                'path': directory_path,
-                'name': directory_info['name'],
-                'date': directory_date.strftime('%Y-%m-%d'),
-                'size_bytes': directory_size,
-                'size_formatted': self._format_size(directory_size)
-            }
-            
-            if directory_date < cutoff_date:
-                to_delete.append(directory_summary)
-                total_size_to_delete += directory_size
-            else:
-                to_keep.append(directory_summary)
+        to_delete = [self._summarize_directory(info, directory_sizes) for info in delete_candidates]
+        to_keep = [self._summarize_directory(info, directory_sizes) for info in keep_candidates]
+        total_size_to_delete = sum(summary['size_bytes'] for summary in to_delete)
         
         return {
             'cutoff_date': cutoff_date.strftime('%Y-%m-%d'),
@@ -177,10 +188,8 @@ class FileCleanupService:
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        import math
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
+        # 1024 = 2**10 なので、単位はビット長から整数演算で決まる
+        i = min((size_bytes.bit_length() - 1) // 10, len(SIZE_NAMES) - 1)
+        s = round(size_bytes / (1 << (i * 10)), 2)
         
-        return f"{s} {size_names[i]}"
+        return f"{s} {SIZE_NAMES[i]}"
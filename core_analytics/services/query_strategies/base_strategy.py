@@ -6,6 +6,7 @@ from typing import Dict, Any
 from azure.monitor.query import LogsQueryResult
 
 from core_analytics.core.interfaces import IQueryStrategy
+from core_analytics.core.models import get_row_count
 
 class BaseQueryStrategy(IQueryStrategy):
     """Base class for query processing strategies."""
@@ -25,6 +26,4 @@ class BaseQueryStrategy(IQueryStrategy):
     
     def _get_row_count(self, data: LogsQueryResult) -> int:
         """Get the number of rows from LogsQueryResult."""
-        if not data or not data.tables or not data.tables[0].rows:
-            return 0
-        return len(data.tables[0].rows)
\ No newline at end of file
+        return get_row_count(data)
\ No newline at end of file
@@ -1,38 +1,63 @@
 """
 Factory for creating query processing strategies.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 
 from core_analytics.core.interfaces import IQueryStrategy
 from .user_count_strategy import UserCountStrategy
 from .stroke_count_strategy import StrokeCountStrategy
 
+_MISSING = object()
+
 class QueryStrategyFactory:
     """Factory for creating and managing query processing strategies."""
     
     def __init__(self):
         self.logger = logging.getLogger("CoreAnalytics")
-        self._strategies: List[IQueryStrategy] = [
-            UserCountStrategy(),
-            StrokeCountStrategy()
-        ]
+        # クエリキーに含まれるトークン -> 戦略（登録順に判定する）
+        self._token_map: Dict[str, IQueryStrategy] = {
+            "user_count": UserCountStrategy(),
+            "stroke_count": StrokeCountStrategy()
+        }
+        # トークンなしで登録された戦略は can_handle で判定する
+        self._fallback_strategies: List[IQueryStrategy] = []
+        # クエリキーごとの判定結果（戦略が見つからなかった None も保持する）
+        self._lookup_cache: Dict[str, Optional[IQueryStrategy]] = {}
     
     def get_strategy(self, query_key: str) -> Optional[IQueryStrategy]:
         """Get the appropriate strategy for a given query key."""
-        for strategy in self._strategies:
-            if strategy.can_handle(query_key):
-                self.logger.debug(f"Found strategy {strategy.__class__.__name__} for query: {query_key}")
-                return strategy
+        cached = self._lookup_cache.get(query_key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        strategy = self._find_strategy(query_key)
+        self._lookup_cache[query_key] = strategy
+        if strategy:
+            self.logger.debug(f"Found strategy {strategy.__class__.__name__} for query: {query_key}")
+            return strategy
         
         self.logger.warning(f"No strategy found for query: {query_key}")
         return None
     
-    def register_strategy(self, strategy: IQueryStrategy) -> None:
-        """Register a new strategy."""
-        self._strategies.append(strategy)
+    def _find_strategy(self, query_key: str) -> Optional[IQueryStrategy]:
+        for token, strategy in self._token_map.items():
+            if token in query_key:
+                return strategy
+        for strategy in self._fallback_strategies:
+            if strategy.can_handle(query_key):
+                return strategy
+        return None
+    
+    def register_strategy(self, strategy: IQueryStrategy, token: Optional[str] = None) -> None:
+        """Register a new strategy, dispatched by a query key substring when token is given."""
+        if token:
+            self._token_map[token] = strategy
+        else:
+            self._fallback_strategies.append(strategy)
+        self._lookup_cache.clear()
         self.logger.info(f"Registered new strategy: {strategy.__class__.__name__}")
     
     def get_all_strategies(self) -> List[IQueryStrategy]:
         """Get all registered strategies."""
-        return self._strategies.copy()
+        return list(self._token_map.values()) + self._fallback_strategies
@@ -0,0 +1,27 @@
+"""
+Process-wide cached service instances.
+"""
+import functools
+
+from core_analytics.config.settings import ConfigurationService
+from core_analytics.model.repositories.azure_blob_repository import AzureBlobRepository
+from core_analytics.services.cost_service import AzureCostService
+from core_analytics.services.email_service import EmailService
+
+
+@functools.lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """Get the shared EmailService. Raises if SendGrid is not configured (failures are not cached)."""
+    return EmailService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_cost_service() -> AzureCostService:
+    """Get the shared AzureCostService."""
+    return AzureCostService()
+
+
+@functools.lru_cache(maxsize=4)
+def get_storage_service(config_service: ConfigurationService) -> AzureBlobRepository:
+    """Get the shared AzureBlobRepository for a configuration service."""
+    return AzureBlobRepository(config_service)
@@ -1,8 +1,43 @@
 import csv
 
+# 小さな write を多数発行しないよう、大きめのバッファでまとめて書き出す
+CSV_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+CSV_LINE_TERMINATOR = "\r\n"
+# これらの文字を含む値はクォートが必要
+_CSV_SPECIAL_CHARS = (",", '"', "\r", "\n")
+
+def _needs_quoting(value) -> bool:
+    # csv.writer は str() した結果で判定するため、dict や list など文字列以外の値も文字列にしてから確認する
+    if value is None:
+        return False
+    text = value if isinstance(value, str) else str(value)
+    return any(char in text for char in _CSV_SPECIAL_CHARS)
+
+def _format_plain_row(row) -> str:
+    # 空の値1つだけの行は、空行と区別するため csv.writer と同じく "" と書き出す
+    if len(row) == 1 and (row[0] is None or row[0] == ""):
+        return '""'
+    return ",".join("" if value is None else str(value) for value in row)
+
+def _write_plain_rows(f, columns, rows):
+    """クォート不要な値だけのテーブルを join で直接書き出す（csv のクォート判定を省く）"""
+    write = f.write
+    write(_format_plain_row(columns))
+    write(CSV_LINE_TERMINATOR)
+    for row in rows:
+        write(_format_plain_row(row))
+        write(CSV_LINE_TERMINATOR)
+
 def create_csv(response):
-    with open("output/result.csv", "w", encoding="ANSI", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(response.tables[0].columns)
-        for row in response.tables[0].rows:
-            writer.writerow(row)
\ No newline at end of file
+    table = response.tables[0]
+    with open("output/result.csv", "w", encoding="ANSI", newline="", buffering=CSV_WRITE_BUFFER_SIZE) as f:
+        # 一部の行だけで判定すると後続行のカンマ等で列がずれるため、全値を確認してから高速経路を使う
+        if not any(map(_needs_quoting, table.columns)) and not any(
+            _needs_quoting(value) for row in table.rows for value in row
+        ):
+            _write_plain_rows(f, table.columns, table.rows)
+            return
+        # クォートが必要なテーブルは csv.writer に任せる（to_csv は NaN を空欄にするなど出力が変わる）
+        writer = csv.writer(f, lineterminator=CSV_LINE_TERMINATOR)
+        writer.writerow(table.columns)
+        writer.writerows(table.rows)
@@ -1,313 +1,326 @@
+import numpy as np
 import pandas as pd
 import openpyxl
-from openpyxl.chart import PieChart, Reference
+import xlsxwriter
+from openpyxl.chart import BarChart, Reference
+from openpyxl.workbook import Workbook
 from azure.monitor.query import LogsQueryResult
-from datetime import datetime
+from datetime import date, datetime
 from zoneinfo import ZoneInfo
+import functools
 import json
+import logging
+from contextlib import contextmanager
 from pathlib import Path
 from openpyxl.utils import get_column_letter
 from datetime import timedelta
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 JST = ZoneInfo("Asia/Tokyo")
 
+# df.to_excel と同じ見た目のヘッダー書式
+_HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+# レポートは XlsxWriter の constant_memory で上の行から順に書き出す（日時の表示形式は openpyxl の既定と同じ）
+_XLSXWRITER_OPTIONS = {
+    "constant_memory": True,
+    "strings_to_numbers": False,
+    "strings_to_formulas": False,
+    "strings_to_urls": False,
+    "default_date_format": "yyyy-mm-dd h:mm:ss",
+}
+_DATE_FORMAT = {"num_format": "yyyy-mm-dd"}
+
 def _convert_timezone_aware_datetimes(df: pd.DataFrame) -> pd.DataFrame:
-    df_processed = df.copy()
-    for column in df_processed.columns:
-        if len(df_processed) > 0:
-            sample_value = df_processed[column].iloc[0]
-            if isinstance(sample_value, datetime) and sample_value.tzinfo is not None:
-                df_processed[column] = (
-                    df_processed[column]
-                    .dt.tz_convert(JST)
-                    .dt.tz_localize(None)
-                )
-    return df_processed
+    # タイムゾーン付きの列は dtype で判定し、該当列だけをその場で JST の naive datetime に変換する（全体のコピーはしない）
+    tz_columns = [column for column, dtype in df.dtypes.items() if isinstance(dtype, pd.DatetimeTZDtype)]
+    for column in tz_columns:
+        df[column] = df[column].dt.tz_convert(JST).dt.tz_localize(None)
+    return df
 
-def _create_excel_from_LogsQueryResult(response:LogsQueryResult, filepath:str, sheet_name:str):
+def _create_result_df(response:LogsQueryResult) -> pd.DataFrame:
     df = pd.DataFrame(data=response.tables[0].rows, columns=response.tables[0].columns)
-    df = _convert_timezone_aware_datetimes(df)
-    df.to_excel(filepath, index=False, sheet_name=sheet_name)
+    return _convert_timezone_aware_datetimes(df)
 
 
-def _read_user_count_excel_to_df(sheet_name: str, filepath :str)->tuple[pd.DataFrame, str]:
-    df = pd.read_excel(filepath, sheet_name=sheet_name)
-    if "Department" in df.columns:
-        column_name = "Department"
-    return df, column_name
+def _excel_cell_values(df:pd.DataFrame) -> pd.DataFrame:
+    """セルにそのまま書ける object 型の DataFrame を返す
 
-def _read_stroke_count_excel_to_df(sheet_name: str, filepath :str)->tuple[pd.DataFrame, str]:
-    df = pd.read_excel(filepath, sheet_name=sheet_name)
-    return df
+    XlsxWriter は NaN / NaT / inf を書き込めないため、to_excel と同じく NaN / NaT は空セル、
+    ±inf は "inf" / "-inf" の文字列にする
+    """
+    values = df.astype(object).where(df.notna(), None)
+    return values.mask(values.isin([np.inf]), "inf").mask(values.isin([-np.inf]), "-inf")
 
 
-def _create_sheet_with_pie_chart(df:pd.DataFrame, filepath:str, column_name:str, sheet_name:str):
-    wb = openpyxl.load_workbook(filepath)    
+def _write_df_to_sheet(workbook:xlsxwriter.Workbook, df:pd.DataFrame, sheet_name:str):
+    # constant_memory のシートに上の行から順に書き出す（書き終えた行はすぐにファイルへ流す）
+    ws = workbook.add_worksheet(sheet_name)
+    ws.write_row(0, 0, [str(column) for column in df.columns], workbook.add_format(_HEADER_FORMAT))
+    values = _excel_cell_values(df)
+    write_row = ws.write_row
+    for row_number, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        write_row(row_number, 0, row)
+    return ws
 
-    dept_counts = df[column_name].value_counts().reset_index()
 
-     # Excelにシートを作成
-    ws2 = wb.create_sheet(sheet_name)
-
-    # ヘッダーとデータ書き込み
-    ws2.append(list(dept_counts.columns))
-    for row in dept_counts.itertuples(index=False):
-        ws2.append(list(row))
+def _create_excel_from_LogsQueryResult(response:LogsQueryResult, filepath:str, sheet_name:str):
+    df = _create_result_df(response)
+    workbook = xlsxwriter.Workbook(filepath, _XLSXWRITER_OPTIONS)
+    _write_df_to_sheet(workbook, df, sheet_name)
+    workbook.close()
 
-    # グラフ用データ範囲
-    if ws2.max_row > 1:
-        labels = Reference(ws2, min_col=1, min_row=2, max_row=ws2.max_row)
-        values = Reference(ws2, min_col=2, min_row=2, max_row=ws2.max_row)
 
-        pie = PieChart()
-        pie.add_data(values, titles_from_data=False)
-        pie.set_categories(labels)
-        pie.title = "Department割合"
+DEPARTMENT_SHEET_NAME = "Department割合"
+STROKE_SUMMARY_SHEET_NAME = "Amount of stroke"
 
-        ws2.add_chart(pie, "E2")
+logger = logging.getLogger("CoreAnalytics")
 
-    wb.save(filepath)
+def _create_department_count_sheet(workbook:xlsxwriter.Workbook, df:pd.DataFrame, column_name:str, sheet_name:str) -> int:
+    """部署ごとの件数シートと円グラフを作成し、書き込んだデータ行数を返す"""
+    # 件数の多い順（円グラフの並び順）のまま、DataFrame に戻さず Series から直接書き込む
+    dept_counts = df[column_name].value_counts()
 
-def _create_sheet_with_stroke_count(df:pd.DataFrame, filepath:str, sheet_name:str):
-    wb = openpyxl.load_workbook(filepath)
-    ws = wb.create_sheet(sheet_name)
+     # Excelにシートを作成
+    ws2 = workbook.add_worksheet(sheet_name)
 
-    #実行日から30日前までの連続日付を作成,土日を除く
-    today = datetime.now(JST).date()
+    # ヘッダーとデータ書き込み
+    ws2.write_row(0, 0, (column_name, "count"))
+    for row_number, (department, count) in enumerate(dept_counts.items(), start=1):
+        ws2.write_row(row_number, 0, (department, int(count)))
+
+    data_rows = len(dept_counts)
+    if data_rows:
+        # 円グラフを作成（ラベルはA列、値はB列）
+        pie = workbook.add_chart({"type": "pie"})
+        pie.add_series({
+            "categories": [sheet_name, 1, 0, data_rows, 0],
+            "values": [sheet_name, 1, 1, data_rows, 1],
+        })
+        pie.set_title({"name": "Department割合"})
+        ws2.insert_chart("E2", pie)
+    return data_rows
+
+@functools.lru_cache(maxsize=4)
+def _business_day_window(today_iso:str) -> Tuple[pd.DatetimeIndex, Tuple[str, ...]]:
+    """実行日から30日前までの連続日付（土日を除く）と、その YYYY-MM-DD 文字列を返す（日付ごとにキャッシュ）"""
+    today = date.fromisoformat(today_iso)
     start_date = today - timedelta(days=29)
     all_days = pd.date_range(start=start_date, end=today, freq="B")
-    df_all = pd.DataFrame(all_days, columns=["stroke_date"])
+    return all_days, tuple(all_days.strftime("%Y-%m-%d"))
+
+def _current_business_day_window() -> Tuple[pd.DatetimeIndex, Tuple[str, ...]]:
+    return _business_day_window(datetime.now(JST).date().isoformat())
 
-    #マージ対象列のデータ型を統一
-    df_all["stroke_date"] = df_all["stroke_date"].dt.date
-    df["stroke_date"] = pd.to_datetime(df["stroke_date"]).dt.date
+def _create_sheet_with_stroke_count(workbook:xlsxwriter.Workbook, df:pd.DataFrame, sheet_name:str) -> pd.DataFrame:
+    ws = workbook.add_worksheet(sheet_name)
 
-    #マージ
-    df_all = df_all.merge(df, on="stroke_date", how="left")
-    df_all["stroke_count"] = df_all["stroke_count"].fillna(0)
-    ws.append(list(df_all.columns))
-    for row in df_all.itertuples(index=False):
-        ws.append(list(row))
-    wb.save(filepath)
+    #実行日から30日前までの連続日付を作成,土日を除く
+    all_days, _ = _current_business_day_window()
+
+    #日付は datetime64 のまま日付単位にそろえ、営業日インデックス上の位置を1回で引く（merge・fillna による float 化を避ける）
+    stroke_dates = pd.to_datetime(df["stroke_date"]).dt.normalize()
+    positions = all_days.get_indexer(stroke_dates)
+    found = positions >= 0
+
+    #該当日がない営業日は 0 のまま、int64 の配列に打鍵数を直接入れる
+    counts = np.zeros(len(all_days), dtype=np.int64)
+    counts[positions[found]] = df["stroke_count"].to_numpy()[found]
+    df_all = pd.DataFrame({"stroke_date": all_days, "stroke_count": counts})
+    ws.write_row(0, 0, tuple(df_all.columns))
+    # 日付はシートに書き込む時点で date にし、時刻なしの表示形式で書く。列をそのまま zip して1行ずつ書き出す
+    date_format = workbook.add_format(_DATE_FORMAT)
+    for row_number, (stroke_date, stroke_count) in enumerate(zip(df_all["stroke_date"].dt.date, df_all["stroke_count"].tolist()), start=1):
+        ws.write_datetime(row_number, 0, stroke_date, date_format)
+        ws.write_number(row_number, 1, stroke_count)
+    return df_all
 
 
 def generate_user_count_excel(response :LogsQueryResult, filepath :str):
-    _create_excel_from_LogsQueryResult(response, filepath, "result")
-    if "Department" in response.tables[0].columns:
-        df, column_name = _read_user_count_excel_to_df("result", filepath)
-        _create_sheet_with_pie_chart(df, filepath, column_name, "Department割合")
+    # 全シートを1つのブックに順に書き出し、close で1回だけ保存する
+    df = _create_result_df(response)
+    workbook = xlsxwriter.Workbook(filepath, _XLSXWRITER_OPTIONS)
+    _write_df_to_sheet(workbook, df, "result")
+    if "Department" in df.columns:
+        _create_department_count_sheet(workbook, df, "Department", DEPARTMENT_SHEET_NAME)
+    workbook.close()
 
-def generate_stroke_count_excel(response :LogsQueryResult, filepath :str):
+def generate_stroke_count_excel(response :LogsQueryResult, filepath :str) -> pd.DataFrame:
+    """打鍵数レポートを出力し、「打鍵数」シートに書き込んだ日別打鍵数を返す（サマリー作成で再読込しないため）"""
     #LogsQueryResultをExcelに出力
-    _create_excel_from_LogsQueryResult(response, filepath, "result")
+    df = _create_result_df(response)
+    workbook = xlsxwriter.Workbook(filepath, _XLSXWRITER_OPTIONS)
+    _write_df_to_sheet(workbook, df, "result")
 
-    #Excelを読み込み、今回の打鍵数を取得する
-    df = _read_stroke_count_excel_to_df("result", filepath)
-    df["TimeGenerated"] = pd.to_datetime(df["TimeGenerated"]).dt.date
-    df_stroke_count = df.groupby("TimeGenerated").size().reset_index(name="stroke_count").rename(columns={"TimeGenerated": "stroke_date"})
+    #今回の打鍵数を取得する
+    stroke_dates = pd.to_datetime(df["TimeGenerated"]).dt.normalize()
+    df_stroke_count = stroke_dates.value_counts(sort=False).rename_axis("stroke_date").reset_index(name="stroke_count")
     
-    _create_sheet_with_stroke_count(df_stroke_count, filepath, "打鍵数")
+    df_daily = _create_sheet_with_stroke_count(workbook, df_stroke_count, "打鍵数")
+    workbook.close()
+    return df_daily
 
 
-def add_row_to_stroke_count_excel(stroke_count:int, filepath:str, sheet_name:str):
+@contextmanager
+def stroke_count_workbook(folder_path:str) -> Iterator[Workbook]:
+    """stroke_count.xlsx を1回だけ読み込み、ブロック内の処理で使い回して最後に1回だけ保存する"""
     # ファイルの存在確認
-    file_path = Path(f"{filepath}/stroke_count.xlsx")
+    file_path = Path(f"{folder_path}/stroke_count.xlsx")
     
     if file_path.exists():
-        # ファイルが存在する場合は開く シートがあるかどうか確認
+        # ファイルが存在する場合は開く
         wb = openpyxl.load_workbook(file_path)
-        
     else:
         # ファイルが存在しない場合は新規作成
         wb = openpyxl.Workbook()
         # デフォルトシートを削除
         wb.remove(wb.active)
 
-    sheet_exists = False
+    try:
+        yield wb
+    finally:
+        # 途中で失敗しても、それまでに追加した内容は保存する（呼び出しごとに保存していた従来と同じ）
+        # シートが1つもないブックは保存できないため、何も書き込まれていなければ保存しない
+        if wb.sheetnames:
+            wb.save(file_path)
+
+def add_row_to_stroke_count_excel(stroke_count:int, filepath:str, sheet_name:str, wb:Optional[Workbook]=None):
+    if wb is None:
+        with stroke_count_workbook(filepath) as wb:
+            return add_row_to_stroke_count_excel(stroke_count, filepath, sheet_name, wb)
+
     # シート名の存在確認
-    for sheet in wb.sheetnames:
-        if sheet == sheet_name:
-            sheet_exists = True
-            break
-    
-    if sheet_exists:
+    if sheet_name in wb.sheetnames:
         ws = wb[sheet_name]
     else:
         # シートが存在しない場合は新規作成
         ws = wb.create_sheet(sheet_name)
-        ws.append(["stroke_date", "stroke_count"])
+        ws.append(("stroke_date", "stroke_count"))
     
     # データを追加
-    ws.append([datetime.now(JST).strftime("%Y-%m-%d"), stroke_count])
-    # ファイル名を指定して保存
-    wb.save(file_path)
+    ws.append((datetime.now(JST).strftime("%Y-%m-%d"), stroke_count))
 
-def generate_stroke_count_summary_excel(datas:pd.DataFrame, filepath:str, sheet_name:str):
-    # ファイルの存在確認
-    file_path = Path(f"{filepath}/stroke_count.xlsx")
-    
-    if file_path.exists():
-        # ファイルが存在する場合は開く シートがあるかどうか確認
-        wb = openpyxl.load_workbook(file_path)
-        
-    else:
-        # ファイルが存在しない場合は新規作成
-        wb = openpyxl.Workbook()
-        # デフォルトシートを削除
-        wb.remove(wb.active)
+def generate_stroke_count_summary_excel(datas:pd.DataFrame, filepath:str, sheet_name:str, wb:Optional[Workbook]=None):
+    if wb is None:
+        with stroke_count_workbook(filepath) as wb:
+            return generate_stroke_count_summary_excel(datas, filepath, sheet_name, wb)
 
-    sheet_exists = False
-    # シート名の存在確認
-    for sheet in wb.sheetnames:
-        if sheet == "Amount of stroke":
-            sheet_exists = True
-            break
-    
-    if sheet_exists:
-        ws = wb["Amount of stroke"]
+    # シート名の存在確認（sheet_name は行ラベルで、書き込み先は常に "Amount of stroke" シート）
+    if STROKE_SUMMARY_SHEET_NAME in wb.sheetnames:
+        ws = wb[STROKE_SUMMARY_SHEET_NAME]
     else:
         # シートが存在しない場合は新規作成
-        ws = wb.create_sheet("Amount of stroke")
+        ws = wb.create_sheet(STROKE_SUMMARY_SHEET_NAME)
 
         #実行日から30日前までの連続日付を作成,土日を除く
-        today = datetime.now(JST).date()
-        start_date = today - timedelta(days=29)
-        all_days = pd.date_range(start=start_date, end=today, freq="B")
-        all_days_array = all_days.strftime("%Y-%m-%d").tolist()
-        all_days_array.insert(0, " ")
-
-        ws.append(all_days_array)
+        _, all_days_str = _current_business_day_window()
+        ws.append((" ",) + all_days_str)
     
     # データを追加
     data_array = datas["stroke_count"].to_list()
     data_array.insert(0, sheet_name)
     ws.append(data_array)
-    # ファイル名を指定して保存
-    wb.save(file_path)
 
-def add_bar_graph_to_stroke_count_excel(folder_path:str):
-    file_path = Path(f"{folder_path}/stroke_count.xlsx")
-    wb = openpyxl.load_workbook(file_path)
-
-    sheet_exists = False
-
-    for sheet in wb.sheetnames:
-        if sheet == "Amount of stroke":
-            sheet_exists = True
-            break
-
-    if sheet_exists:
-        ws = wb["Amount of stroke"]
-    else:
-        ws = wb.create_sheet("Amount of stroke")
-    
-    # 全シートのB列のデータを収集
-    all_data = []
-    
+def _sum_stroke_counts_by_sheet(wb:Workbook) -> dict:
+    """全シート（集計シート自身を除く）のB列の値をシートごとに合計する"""
+    # ヘッダー行を除き、iter_rows で1回だけ走査する（read_only ブックでも max_row を使わない）
+    totals = {}
     for sheet_name in wb.sheetnames:
-        if sheet_name == "Amount of stroke":
+        if sheet_name == STROKE_SUMMARY_SHEET_NAME:
             continue  # 自分自身は除外
         
-        sheet = wb[sheet_name]
-        
-        # B列のデータを取得（ヘッダー行を除く）
-        for row in range(2, sheet.max_row + 1):
-            col_b = sheet[f'B{row}'].value
-            
-            if col_b is not None:
-                all_data.append({
-                    'sheet': sheet_name,
-                    'col_b': col_b
-                })
+        for (col_b,) in wb[sheet_name].iter_rows(min_row=2, min_col=2, max_col=2, values_only=True):
+            if col_b is None:
+                continue
+            # 値が1つでもあるシートは、数値がなくても合計0として載せる
+            total = totals.setdefault(sheet_name, 0)
+            if isinstance(col_b, (int, float)):
+                totals[sheet_name] = total + col_b
+    return totals
+
+def add_bar_graph_to_stroke_count_excel(folder_path:str, wb:Optional[Workbook]=None) -> bool:
+    """全シートのB列の合計を棒グラフにする。グラフを書き込んだ場合に True を返す"""
+    if wb is None:
+        file_path = Path(f"{folder_path}/stroke_count.xlsx")
+        # ブックは1回だけ開いて集計とグラフ作成に使い、書き込んだ場合だけ保存する
+        wb = openpyxl.load_workbook(file_path)
+        dirty = add_bar_graph_to_stroke_count_excel(folder_path, wb)
+        if dirty:
+            wb.save(file_path)
+        return dirty
+
+    totals = _sum_stroke_counts_by_sheet(wb)
     
-    # データを整理して棒グラフ用のデータを作成
-    if all_data:
-        # シート名ごとにデータをグループ化
-        sheet_summary = {}
-        for data in all_data:
-            sheet_name = data['sheet']
-            if sheet_name not in sheet_summary:
-                sheet_summary[sheet_name] = []
-            sheet_summary[sheet_name].append(data)
+    # 棒グラフを作成
+    if totals:
+        if STROKE_SUMMARY_SHEET_NAME in wb.sheetnames:
+            ws = wb[STROKE_SUMMARY_SHEET_NAME]
+        else:
+            ws = wb.create_sheet(STROKE_SUMMARY_SHEET_NAME)
+
+        # ヘッダーを追加
+        ws['A1'] = 'Sheet Name'
+        ws['B1'] = 'Total Amount of stroke'
         
-        # 棒グラフ用のデータを作成
-        graph_data = []
-        for sheet_name, data_list in sheet_summary.items():
-            # B列の値を合計
-            total_b = sum(item['col_b'] for item in data_list if isinstance(item['col_b'], (int, float)))
-            
-            graph_data.append({
-                'sheet_name': sheet_name,
-                'total_amount_of_stroke': total_b
-            })
+        # データを書き込み（座標文字列を組み立てず、行・列番号で直接指定する）
+        for i, (sheet_name, total_amount_of_stroke) in enumerate(totals.items(), start=2):
+            ws.cell(row=i, column=1, value=sheet_name)
+            ws.cell(row=i, column=2, value=total_amount_of_stroke)
         
         # 棒グラフを作成
-        if graph_data:
-            # ヘッダーを追加
-            ws['A1'] = 'Sheet Name'
-            ws['B1'] = 'Total Amount of stroke'
-            
-            # データを書き込み
-            for i, data in enumerate(graph_data, start=2):
-                ws[f'A{i}'] = data['sheet_name']
-                ws[f'B{i}'] = data['total_amount_of_stroke']
-            
-            # 棒グラフを作成
-            from openpyxl.chart import BarChart, Reference
-            
-            chart = BarChart()
-            chart.title = "Comparison of B Column Values Across Sheets"
-            chart.x_axis.title = "Sheet Names"
-            chart.y_axis.title = "Total Amount of stroke"
-            
-            # データ範囲を指定
-            data = Reference(ws, min_col=2, min_row=1, max_row=len(graph_data)+1, max_col=2)
-            categories = Reference(ws, min_col=1, min_row=2, max_row=len(graph_data)+1)
-            
-            chart.add_data(data, titles_from_data=True)
-            chart.set_categories(categories)
-            
-            # グラフを配置
-            ws.add_chart(chart, "D2")
-            
-            print(f"棒グラフを作成しました: {len(graph_data)}シートのデータを比較")
-        else:
-            print("グラフ用のデータが見つかりませんでした")
-    else:
-        print("シートからデータを取得できませんでした")
-    
-    # ファイルを保存
-    wb.save(file_path)
+        chart = BarChart()
+        chart.title = "Comparison of B Column Values Across Sheets"
+        chart.x_axis.title = "Sheet Names"
+        chart.y_axis.title = "Total Amount of stroke"
+        
+        # データ範囲を指定
+        data = Reference(ws, min_col=2, min_row=1, max_row=len(totals)+1, max_col=2)
+        categories = Reference(ws, min_col=1, min_row=2, max_row=len(totals)+1)
+        
+        chart.add_data(data, titles_from_data=True)
+        chart.set_categories(categories)
+        
+        # グラフを配置
+        ws.add_chart(chart, "D2")
+        
+        logger.info(f"棒グラフを作成しました: {len(totals)}シートのデータを比較")
+        return True
+
+    logger.warning("シートからデータを取得できませんでした")
+    return False
 
-def create_line_graph(folder_path:str) -> List[str]:
+def create_line_graph(folder_path:str, wb:Optional[Workbook]=None) -> List[str]:
     file_path = Path(f"{folder_path}/stroke_count.xlsx")
-    wb = openpyxl.load_workbook(file_path)
+    # 読み取りだけなので、ブックが渡されなければ read_only で開く（セルオブジェクトを作らずに行を読む）
+    owns_workbook = wb is None
+    if owns_workbook:
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
 
     try:
-        ws = wb["Amount of stroke"]
-    except Exception as e:
-        raise KeyError(f"シートが見つかりませんでした: {e}")
-
-    # 全シートのA列（日にち）と最後の列（打鍵数）の最新データを収集
-    header_row = [ws.cell(row=1, column=c).value for c in range(1, ws.max_column + 1)]
-    all_data = []
-    for r in range(2, ws.max_row + 1):
-        row = [ws.cell(row=r, column=c).value for c in range(1, ws.max_column + 1)]
-        all_data.append(row)
+        try:
+            ws = wb[STROKE_SUMMARY_SHEET_NAME]
+        except Exception as e:
+            raise KeyError(f"シートが見つかりませんでした: {e}")
+
+        # 全シートのA列（日にち）と最後の列（打鍵数）の最新データを収集
+        rows = [list(row) for row in ws.iter_rows(values_only=True)]
+    finally:
+        if owns_workbook:
+            wb.close()
+
+    # 行ごとの長さをそろえる（従来の max_column 分の読み取りと同じ）
+    max_col = max((len(row) for row in rows), default=0)
+    for row in rows:
+        row.extend([None] * (max_col - len(row)))
+    header_row = rows[0] if rows else []
+    all_data = rows[1:]
     
     
     # データを整理して折れ線グラフ用のデータを作成
     if all_data:
-
-        max_col = ws.max_column
-        
-         # ファイルを保存
-        wb.save(file_path)
-        import xlsxwriter
         # 新しいExcelファイルを作成
 
-        workbook = xlsxwriter.Workbook(f"{folder_path}/Stroke_Count_Line_Chart.xlsx")
+        # 行は上から順に書き込むため constant_memory で1行ずつ書き出してメモリを一定に保つ
+        workbook = xlsxwriter.Workbook(f"{folder_path}/Stroke_Count_Line_Chart.xlsx", {"constant_memory": True})
         sheet_name = "stroke_count"
         worksheet = workbook.add_worksheet(sheet_name)
 
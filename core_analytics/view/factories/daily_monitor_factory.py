@@ -3,7 +3,7 @@ Factory for creating daily monitor reports using Excel templates.
 """
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, time
 import logging
 import pandas as pd
 import openpyxl
@@ -11,17 +11,79 @@ from openpyxl import load_workbook
 import shutil
 import pytz
 from openpyxl.utils import column_index_from_string
+from openpyxl.utils.cell import range_boundaries
+import xlsxwriter
 
 from core_analytics.core.models import ProcessData
-from core_analytics.view.excel_utils import _convert_timezone_aware_datetimes
+from core_analytics.view.excel_utils import _convert_timezone_aware_datetimes, _excel_cell_values
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+# Daily count columns (x, y) per query key on the month sheet
+DAILY_COLUMN_MAPPINGS = {
+    "daily_alm_chat_count": ("B", "C"),
+    "daily_alm_dashboard_count": ("D", "E"),
+    "daily_doc_search_count": ("H", "I"),
+    "daily_my_assistant_search_count": ("P", "Q"),
+    "daily_my_assistant_upload_count": ("R", "S"),
+    "daily_market_report_web_count": ("V", "W"),
+    "daily_company_analyze_count": ("X", "Y"),
+    "daily_market_report_bot_count": ("Z", "AA"),
+    "daily_brain_count": ("AD", "AE"),
+}
+COST_COLUMNS = ("J", "K", "L", "M")
+DATE_LABEL_COLUMNS = ("A", "G", "O", "U", "AC")
+# Column indices resolved once so cells are addressed by (row, column) without parsing coordinate strings
+_DAILY_COLUMN_INDICES = {
+    query_key: (column_index_from_string(x_col), column_index_from_string(y_col))
+    for query_key, (x_col, y_col) in DAILY_COLUMN_MAPPINGS.items()
+}
+_COST_COLUMN_INDICES = tuple(column_index_from_string(col) for col in COST_COLUMNS)
+_DATE_LABEL_COLUMN_INDICES = tuple(column_index_from_string(col) for col in DATE_LABEL_COLUMNS)
+
+EXCEL_MAX_CELL_LENGTH = 32767
+# Values XlsxWriter writes natively; everything else is written as a sanitized string
+_NATIVE_EXCEL_TYPES = (datetime, date, time, int, float)
+
+
+def _sanitize_excel_value(value, max_len: int = EXCEL_MAX_CELL_LENGTH):
+    if value is None or isinstance(value, _NATIVE_EXCEL_TYPES):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            value = value.decode("utf-8", errors="ignore")
+        except Exception:
+            value = str(value)
+    if not isinstance(value, str):
+        value = str(value)
+    value = ILLEGAL_CHARACTERS_RE.sub("", value)
+    if len(value) > max_len:
+        value = value[:max_len]
+    return value
+
+
+def _sanitize_excel_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Sanitize object and string columns only; numeric and datetime columns are written by XlsxWriter as they are."""
+    for position, dtype in enumerate(df.dtypes):
+        if dtype != object and not isinstance(dtype, pd.StringDtype):
+            continue
+        column = df.iloc[:, position]
+        if pd.api.types.infer_dtype(column, skipna=True) == "string":
+            # Pure text columns are cleaned with vectorized str operations; missing values are kept as they are
+            column = column.str.replace(ILLEGAL_CHARACTERS_RE, "", regex=True).str.slice(0, EXCEL_MAX_CELL_LENGTH)
+        else:
+            column = column.map(_sanitize_excel_value)
+        df.isetitem(position, column)
+    return df
+
+
+
 class DailyMonitorFactory:
     """Factory for creating daily monitor reports using Excel templates."""
     
     def __init__(self):
         self.logger = logging.getLogger("CoreAnalytics")
         self.template_dir = Path("./config/report_template")
+        self._history_template_layout: Optional[Dict[str, Any]] = None
     
     def _copy_template_to_output(self, template_name: str, output_dir: Path, end_time: datetime, output_suffix: str = "report") -> Path:
         """Copy Excel template to output directory with date."""
@@ -33,7 +95,7 @@ class DailyMonitorFactory:
         output_filename = f"daily_monitor_{output_suffix}_{end_time.strftime('%Y%m%d')}.xlsx"
         output_path = output_dir / output_filename
         
-        shutil.copy2(template_path, output_path)
+        shutil.copyfile(template_path, output_path)
         self.logger.info(f"Copied template {template_name} to {output_path}")
         
         return output_path
@@ -44,10 +106,16 @@ class DailyMonitorFactory:
         processed_data: ProcessData,
         target_date: datetime,
         mtd_costs: Optional[Dict[str, float]] = None,
+        workbook: Optional[openpyxl.Workbook] = None,
     ) -> None:
-        """Fill Excel template with query results for a specific date."""
+        """Fill Excel template with query results for a specific date.
+        
+        If an already loaded workbook is given it is updated in memory and the caller is responsible for saving it.
+        """
         try:
-            workbook = load_workbook(template_path)
+            owns_workbook = workbook is None
+            if owns_workbook:
+                workbook = load_workbook(template_path)
 
             jst = pytz.timezone('Asia/Tokyo')
             current_date = target_date.astimezone(jst)
@@ -56,7 +124,8 @@ class DailyMonitorFactory:
 
             self._fill_daily_data(workbook, processed_data, current_date, mtd_costs)
 
-            workbook.save(template_path)
+            if owns_workbook:
+                workbook.save(template_path)
             self.logger.info(f"Successfully filled template: {template_path}")
             
         except Exception as e:
@@ -66,7 +135,6 @@ class DailyMonitorFactory:
     def _ensure_month_sheet_exists(self, workbook: openpyxl.Workbook, current_date: datetime) -> None:
         """Ensure current month sheet exists, copying template or previous month when needed."""
         try:
-            from copy import copy
             from datetime import timedelta
             import calendar
 
@@ -97,31 +165,16 @@ class DailyMonitorFactory:
             sheets.insert(0, sheets.pop(idx_new))
 
             ranges = [("A", "E"), ("G", "M"), ("O", "S"), ("U", "AA"), ("AC", "AE")]
-            for start_col, end_col in ranges:
-                start_idx = column_index_from_string(start_col)
-                end_idx = column_index_from_string(end_col)
-                for r in range(4, 41):
-                    for c in range(start_idx, end_idx + 1):
-                        cell = new_ws.cell(row=r, column=c)
-
-                        saved_number_format = copy(cell.number_format)
-                        saved_border = copy(cell.border)
-                        saved_fill = copy(cell.fill)
-                        saved_font = copy(cell.font)
-                        saved_alignment = copy(cell.alignment)
-                        saved_protection = copy(cell.protection)
-
+            column_bands = [(column_index_from_string(start_col), column_index_from_string(end_col)) for start_col, end_col in ranges]
+            for start_idx, end_idx in column_bands:
+                # One iter_rows traversal per band instead of a ws.cell() lookup per coordinate
+                for row_cells in new_ws.iter_rows(min_row=4, max_row=40, min_col=start_idx, max_col=end_idx):
+                    for cell in row_cells:
+                        # Assigning a value leaves the cell's style untouched, so formats survive without copying
                         cell.value = None
                         if cell.hyperlink:
                             cell.hyperlink = None
 
-                        cell.number_format = saved_number_format
-                        cell.border = saved_border
-                        cell.fill = saved_fill
-                        cell.font = saved_font
-                        cell.alignment = saved_alignment
-                        cell.protection = saved_protection
-
             last_day_num = calendar.monthrange(current_date.year, current_date.month)[1]
 
             row = 4
@@ -129,22 +182,8 @@ class DailyMonitorFactory:
                 if row > 40:
                     break
                 label = f"{current_date.month}月{d}日"
-                for col in ("A", "G", "O", "U", "AC"):
-                    cell = new_ws[f"{col}{row}"]
-                    saved_number_format = copy(cell.number_format)
-                    saved_border = copy(cell.border)
-                    saved_fill = copy(cell.fill)
-                    saved_font = copy(cell.font)
-                    saved_alignment = copy(cell.alignment)
-                    
-                    cell.value = label
-                    
-                    cell.number_format = saved_number_format
-                    cell.border = saved_border
-                    cell.fill = saved_fill
-                    cell.font = saved_font
-                    cell.alignment = saved_alignment
-                    
+                for col_idx in _DATE_LABEL_COLUMN_INDICES:
+                    new_ws.cell(row=row, column=col_idx).value = label
                 row += 1
                 
             self.logger.info(f"Created new month sheet '{sheet_name}' with all formats preserved")
@@ -155,25 +194,9 @@ class DailyMonitorFactory:
     def _fill_daily_data(self, workbook: openpyxl.Workbook, processed_data: ProcessData, current_date: datetime, mtd_costs: Optional[Dict[str, float]] = None) -> None:
         """Fill daily data into the appropriate sheet and cells based on current date."""
         try:
-            from copy import copy
-            
             def set_cell_value_keep_format(cell, value):
-                """Set cell value while keeping all formats."""
-                saved_number_format = copy(cell.number_format)
-                saved_border = copy(cell.border)
-                saved_fill = copy(cell.fill)
-                saved_font = copy(cell.font)
-                saved_alignment = copy(cell.alignment)
-                saved_protection = copy(cell.protection)
-                
+                """Set cell value while keeping all formats (openpyxl keeps the cell's style on value assignment)."""
                 cell.value = value
-                
-                cell.number_format = saved_number_format
-                cell.border = saved_border
-                cell.fill = saved_fill
-                cell.font = saved_font
-                cell.alignment = saved_alignment
-                cell.protection = saved_protection
             
             sheet_name = f"{current_date.year}年{current_date.month}月"
             
@@ -183,24 +206,16 @@ class DailyMonitorFactory:
             
             ws = workbook[sheet_name]
             
-            target_row = self._find_date_row(ws, current_date)
+            date_row_index = self._build_date_row_index(ws)
+            target_row = date_row_index.get(f"{current_date.month}月{current_date.day}日")
             if target_row is None:
                 self.logger.warning(f"Could not find row for date {current_date.strftime('%m月%d日')} in sheet {sheet_name}")
                 return
             
-            column_mappings = {
-                "daily_alm_chat_count": ("B", "C"),
-                "daily_alm_dashboard_count": ("D", "E"),
-                "daily_doc_search_count": ("H", "I"),
-                "daily_my_assistant_search_count": ("P", "Q"),
-                "daily_my_assistant_upload_count": ("R", "S"),
-                "daily_market_report_web_count": ("V", "W"),
-                "daily_company_analyze_count": ("X", "Y"),
-                "daily_market_report_bot_count": ("Z", "AA"),
-                "daily_brain_count": ("AD", "AE"),
-            }
-            
-            for query_key, (x_col, y_col) in column_mappings.items():
+            for query_key, (x_col, y_col) in DAILY_COLUMN_MAPPINGS.items():
+                x_idx, y_idx = _DAILY_COLUMN_INDICES[query_key]
+                x_cell = ws.cell(row=target_row, column=x_idx)
+                y_cell = ws.cell(row=target_row, column=y_idx)
                 try:
                     result = self._get_query_result(processed_data, query_key)
                     
@@ -210,34 +225,34 @@ class DailyMonitorFactory:
                             x_value = rows[0][0]
                             y_value = rows[0][1]
                             
-                            set_cell_value_keep_format(ws[f"{x_col}{target_row}"], x_value)
-                            set_cell_value_keep_format(ws[f"{y_col}{target_row}"], y_value)
+                            set_cell_value_keep_format(x_cell, x_value)
+                            set_cell_value_keep_format(y_cell, y_value)
                             
                             self.logger.info(f"Filled {query_key}: [{x_value}, {y_value}] -> {x_col}{target_row}, {y_col}{target_row}")
                         else:
-                            set_cell_value_keep_format(ws[f"{x_col}{target_row}"], 0)
-                            set_cell_value_keep_format(ws[f"{y_col}{target_row}"], 0)
+                            set_cell_value_keep_format(x_cell, 0)
+                            set_cell_value_keep_format(y_cell, 0)
                             self.logger.warning(f"No data for {query_key}, filled with [0, 0]")
                     else:
-                        set_cell_value_keep_format(ws[f"{x_col}{target_row}"], 0)
-                        set_cell_value_keep_format(ws[f"{y_col}{target_row}"], 0)
+                        set_cell_value_keep_format(x_cell, 0)
+                        set_cell_value_keep_format(y_cell, 0)
                         self.logger.warning(f"No result for {query_key}, filled with [0, 0]")
                         
                 except Exception as e:
                     self.logger.error(f"Failed to fill data for {query_key}: {e}")
-                    ws[f"{x_col}{target_row}"] = "ERROR"
-                    ws[f"{y_col}{target_row}"] = "ERROR"
+                    x_cell.value = "ERROR"
+                    y_cell.value = "ERROR"
             
             if mtd_costs:
                 try:
                     cost_items = list(mtd_costs.items())
-                    cost_cols = ["J", "K", "L", "M"]
+                    cost_cols = COST_COLUMNS
 
                     for idx, (name, val) in enumerate(cost_items[:len(cost_cols)]):
-                        set_cell_value_keep_format(ws[f"{cost_cols[idx]}{target_row}"], val)
+                        set_cell_value_keep_format(ws.cell(row=target_row, column=_COST_COLUMN_INDICES[idx]), val)
 
-                    for col in cost_cols[len(cost_items):]:
-                        set_cell_value_keep_format(ws[f"{col}{target_row}"], 0)
+                    for col_idx in _COST_COLUMN_INDICES[len(cost_items):]:
+                        set_cell_value_keep_format(ws.cell(row=target_row, column=col_idx), 0)
 
                     try:
                         msg_pairs = []
@@ -250,132 +265,155 @@ class DailyMonitorFactory:
 
                 except Exception as e:
                     self.logger.error(f"Failed to fill MTD costs: {e}")
-                    for col in ["J", "K", "L", "M"]:
-                        ws[f"{col}{target_row}"] = "ERROR"
+                    for col_idx in _COST_COLUMN_INDICES:
+                        ws.cell(row=target_row, column=col_idx).value = "ERROR"
             
         except Exception as e:
             self.logger.error(f"Failed to fill daily data: {e}")
     
-    def _find_date_row(self, worksheet, current_date: datetime) -> int:
-        """Find the row number that matches the current date in column A."""
+    def _build_date_row_index(self, worksheet) -> Dict[str, int]:
+        """Map each date label in column A to its row number (first occurrence wins), reading the column once."""
+        date_row_index = {}
         try:
-            target_date_str = f"{current_date.month}月{current_date.day}日"
-            
-            for row in range(1, worksheet.max_row + 1):
-                cell_value = worksheet[f"A{row}"].value
-                if cell_value and str(cell_value).strip() == target_date_str:
-                    return row
-            
-            return None
-            
+            for row, (cell_value,) in enumerate(worksheet.iter_rows(min_col=1, max_col=1, values_only=True), start=1):
+                if cell_value:
+                    date_row_index.setdefault(str(cell_value).strip(), row)
         except Exception as e:
-            self.logger.error(f"Error finding date row: {e}")
-            return None
+            self.logger.error(f"Error building date row index: {e}")
+        
+        return date_row_index
     
     def _get_query_result(self, processed_data: ProcessData, query_key: str):
         """Get query result from processed data."""
-        for results_dict in [processed_data.user_count_results, 
-                           processed_data.stroke_count_results, 
-                           processed_data.unknown_results]:
+        for results_dict in processed_data.results.values():
             if query_key in results_dict:
                 return results_dict[query_key]
         return None
     
+    def _get_history_template_layout(self) -> Dict[str, Any]:
+        """Read layout (font, headers, column widths, tables) from the history template once."""
+        if self._history_template_layout is not None:
+            return self._history_template_layout
+        
+        template_path = self.template_dir / "市場GAI打鍵履歴_YYYYMMDD.xlsx"
+        if not template_path.exists():
+            raise FileNotFoundError(f"Template file not found: {template_path}")
+        
+        workbook = load_workbook(template_path)
+        sheets = []
+        for ws in workbook.worksheets:
+            table = next(iter(ws.tables.values()), None)
+            if table is not None:
+                min_col, min_row, max_col, max_row = range_boundaries(table.ref)
+            else:
+                min_col, min_row, max_col, max_row = 1, 1, ws.max_column, ws.max_row
+            
+            sheets.append({
+                "title": ws.title,
+                "headers": [ws.cell(row=min_row, column=c).value for c in range(min_col, max_col + 1)],
+                "column_widths": [(dim.min, dim.max, dim.width) for dim in ws.column_dimensions.values() if dim.width],
+                "table": {
+                    "name": table.name,
+                    "style": table.tableStyleInfo.name if table.tableStyleInfo else None,
+                } if table is not None else None,
+            })
+        
+        header_font = workbook.worksheets[0]["A1"].font
+        self._history_template_layout = {
+            "font_name": header_font.name,
+            "font_size": header_font.sz,
+            "sheets": sheets,
+        }
+        return self._history_template_layout
+    
     def _fill_history_template_with_data(self, template_path: Path, processed_data: ProcessData) -> None:
-        """Fill history Excel template with query results."""
+        """Write history report to template_path, replaying the history template layout with XlsxWriter."""
         try:
-            workbook = load_workbook(template_path)
-            
-            self._fill_history_data_to_sheets(workbook, processed_data)
+            layout = self._get_history_template_layout()
             
-            workbook.save(template_path)
+            workbook = xlsxwriter.Workbook(str(template_path), {
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+                "default_format_properties": {
+                    "font_name": layout["font_name"],
+                    "font_size": layout["font_size"],
+                },
+            })
+            try:
+                self._fill_history_data_to_sheets(workbook, layout, processed_data)
+            finally:
+                workbook.close()
             self.logger.info(f"Successfully filled history template: {template_path}")
             
         except Exception as e:
             self.logger.error(f"Failed to fill history template {template_path}: {e}")
             raise
     
-    def _fill_history_data_to_sheets(self, workbook: openpyxl.Workbook, processed_data: ProcessData) -> None:
+    def _fill_history_data_to_sheets(self, workbook: xlsxwriter.Workbook, layout: Dict[str, Any], processed_data: ProcessData) -> None:
         """Fill history data into specific sheets."""
         try:
             sheet_mappings = {
-                "daily_alm_chat_history": "外貨ALM-Chat",
-                "daily_alm_dashboard_history": "外貨ALM-Dashboard", 
-                "daily_doc_search_history": "ドキュメントサーチ",
-                "daily_my_assistant_search_history": "My Assistant-検索",
-                "daily_my_assistant_upload_history": "My Assistant-アップロード",
-                "daily_market_report_web_history": "マーケット分析Web",
-                "daily_market_report_bot_history": "マーケット分析Bot",
-                "daily_company_analyze_history": "会社情報",
-                "daily_brain_history": "為替分析Brain",
+                "外貨ALM-Chat": "daily_alm_chat_history",
+                "外貨ALM-Dashboard": "daily_alm_dashboard_history", 
+                "ドキュメントサーチ": "daily_doc_search_history",
+                "My Assistant-検索": "daily_my_assistant_search_history",
+                "My Assistant-アップロード": "daily_my_assistant_upload_history",
+                "マーケット分析Web": "daily_market_report_web_history",
+                "マーケット分析Bot": "daily_market_report_bot_history",
+                "会社情報": "daily_company_analyze_history",
+                "為替分析Brain": "daily_brain_history",
             }
             
-            def _sanitize_excel_value(value, max_len: int = 32767):
-                if value is None:
-                    return None
-                from datetime import datetime as _dt, date as _date, time as _time
-                if isinstance(value, (_dt, _date, _time)):
-                    return value
-                if isinstance(value, (int, float)):
-                    return value
-                if isinstance(value, (bytes, bytearray)):
-                    try:
-                        value = value.decode("utf-8", errors="ignore")
-                    except Exception:
-                        value = str(value)
-                if not isinstance(value, str):
-                    value = str(value)
-                value = ILLEGAL_CHARACTERS_RE.sub("", value)
-                if len(value) > max_len:
-                    value = value[:max_len]
-                return value
-
-            for query_key, sheet_name in sheet_mappings.items():
+            for sheet_layout in layout["sheets"]:
+                sheet_name = sheet_layout["title"]
+                ws = workbook.add_worksheet(sheet_name)
+                for first_col, last_col, width in sheet_layout["column_widths"]:
+                    ws.set_column(first_col - 1, last_col - 1, width)
+                
+                row_count = 0
+                query_key = sheet_mappings.get(sheet_name)
                 try:
-                    if sheet_name not in workbook.sheetnames:
-                        self.logger.warning(f"Sheet '{sheet_name}' not found in workbook. Available sheets: {workbook.sheetnames}")
-                        continue
-                    
-                    ws = workbook[sheet_name]
-                    result = self._get_query_result(processed_data, query_key)
+                    result = self._get_query_result(processed_data, query_key) if query_key else None
                     
                     if result and result.get("data") and result["data"].tables:
-                        self._clear_worksheet_data(ws)
-                        
                         df = pd.DataFrame(
                             data=result["data"].tables[0].rows,
                             columns=result["data"].tables[0].columns
                         )
-                        df = _convert_timezone_aware_datetimes(df)
+                        df = _sanitize_excel_columns(_convert_timezone_aware_datetimes(df))
+                        # NaN / NaT are written as empty cells and ±inf as text; XlsxWriter cannot write them as numbers or dates
+                        values = _excel_cell_values(df)
                         
-                        for row_idx, (_, row_data) in enumerate(df.iterrows(), start=2):
-                            for col_idx, value in enumerate(row_data, start=1):
-                                ws.cell(row=row_idx, column=col_idx, value=_sanitize_excel_value(value))
+                        write_row = ws.write_row
+                        for row_idx, row_data in enumerate(values.itertuples(index=False, name=None), start=1):
+                            write_row(row_idx, 0, row_data)
+                        row_count = len(df)
                         
-                        self.logger.info(f"Filled {len(df)} rows for {query_key} in sheet '{sheet_name}'")
-                    else:
+                        self.logger.info(f"Filled {row_count} rows for {query_key} in sheet '{sheet_name}'")
+                    elif query_key:
                         self.logger.warning(f"No data found for {query_key}")
                         
                 except Exception as e:
                     self.logger.error(f"Failed to fill data for {query_key} in sheet '{sheet_name}': {e}")
-                    continue
+                
+                headers = sheet_layout["headers"]
+                table = sheet_layout["table"]
+                if table is not None:
+                    table_options = {
+                        "name": table["name"],
+                        "columns": [{"header": str(header)} for header in headers],
+                    }
+                    if table["style"]:
+                        table_options["style"] = table["style"]
+                    # Size the table to the data; the template's whole-column range would make XlsxWriter materialize every row
+                    ws.add_table(0, 0, max(row_count, 1), len(headers) - 1, table_options)
+                else:
+                    ws.write_row(0, 0, headers)
             
         except Exception as e:
             self.logger.error(f"Failed to fill history data to sheets: {e}")
     
-    def _clear_worksheet_data(self, worksheet) -> None:
-        """Clear worksheet data while keeping the first row as headers."""
-        try:
-            max_row = worksheet.max_row
-            if max_row > 1:
-                for row in worksheet.iter_rows(min_row=2, max_row=max_row):
-                    for cell in row:
-                        cell.value = None
-                        if cell.hyperlink:
-                            cell.hyperlink = None
-        except Exception as e:
-            self.logger.error(f"Failed to clear worksheet data: {e}")
-    
     def generate_daily_monitor_report(self, processed_data: ProcessData, output_dir: str, end_time: datetime, mtd_costs: Optional[Dict[str, float]] = None) -> List[str]:
         """Generate daily monitor report using Excel templates."""
         self.logger.info("Starting daily monitor report generation")
@@ -400,22 +438,31 @@ class DailyMonitorFactory:
         
         return generated_files
     
-    def _generate_cumulative_usage_report(self, output_path: Path, processed_data: ProcessData, end_time: datetime, mtd_costs: Optional[Dict[str, float]] = None) -> Path:
-        """Generate cumulative usage report (updates existing file)."""
+    def _generate_cumulative_usage_report(self, output_path: Path, processed_data: ProcessData, end_time: datetime, mtd_costs: Optional[Dict[str, float]] = None, usage_workbook: Optional[openpyxl.Workbook] = None) -> Path:
+        """Generate cumulative usage report (updates existing file).
+        
+        When usage_workbook is given, it is updated in memory only and the caller must save it.
+        """
         base_dir = Path("output/市場GAI打鍵")
         base_dir.mkdir(parents=True, exist_ok=True)
         usage_report_path = base_dir / "市場GAI使用状況.xlsx"
         
-        if usage_report_path.exists():
+        if usage_workbook is not None:
+            self.logger.info(f"Updating loaded usage report in memory: {usage_report_path}")
+        elif usage_report_path.exists():
             self.logger.info(f"Found existing usage report, updating: {usage_report_path}")
         else:
             self.logger.info(f"Creating new usage report from template: {usage_report_path}")
             template_path = self.template_dir / "市場GAI使用状況.xlsx"
             if not template_path.exists():
                 raise FileNotFoundError(f"Template file not found: {template_path}")
-            shutil.copy2(template_path, usage_report_path)
+            # Fill the template in memory and save it straight to the report path instead of copying then reloading the copy
+            new_workbook = load_workbook(template_path)
+            self._fill_template_with_data(usage_report_path, processed_data, end_time, mtd_costs, new_workbook)
+            new_workbook.save(usage_report_path)
+            return usage_report_path
         
-        self._fill_template_with_data(usage_report_path, processed_data, end_time, mtd_costs)
+        self._fill_template_with_data(usage_report_path, processed_data, end_time, mtd_costs, usage_workbook)
 
         return usage_report_path
     
@@ -431,13 +478,7 @@ class DailyMonitorFactory:
         base_dir.mkdir(parents=True, exist_ok=True)
         history_report_path = base_dir / f"市場GAI打鍵履歴_{date_str}.xlsx"
         
-        template_path = self.template_dir / "市場GAI打鍵履歴_YYYYMMDD.xlsx"
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template file not found: {template_path}")
-        
-        shutil.copy2(template_path, history_report_path)
-        self.logger.info(f"Created new history report from template: {history_report_path}")
-        
         self._fill_history_template_with_data(history_report_path, processed_data)
+        self.logger.info(f"Created new history report: {history_report_path}")
         
         return history_report_path
@@ -1,100 +1,167 @@
 """
 Factory for creating different types of reports.
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import logging
+import multiprocessing
+import os
+import threading
 
 from azure.monitor.query import LogsQueryResult
 
 from core_analytics.core.interfaces import IReportGenerator
 from core_analytics.core.logging_config import ReportGenerationError
 import pandas as pd
-from core_analytics.view.excel_utils import generate_user_count_excel, generate_stroke_count_excel, generate_stroke_count_summary_excel, add_bar_graph_to_stroke_count_excel, create_line_graph
+from core_analytics.view.excel_utils import generate_user_count_excel, generate_stroke_count_excel, generate_stroke_count_summary_excel, add_bar_graph_to_stroke_count_excel, create_line_graph, stroke_count_workbook
 
 from core_analytics.core.models import ProcessData
 
+# Excel serialization is CPU-bound pure Python, so independent reports are written in separate processes.
+# os.cpu_count() reports the host rather than the container's CPU limit, so the pool size is capped explicitly.
+MAX_REPORT_WORKERS = max(1, min(
+    int(os.environ.get("REPORT_MAX_WORKERS", "4")),
+    getattr(os, "process_cpu_count", os.cpu_count)() or 1,
+))
+
+# One worker pool per process, created on first use and reused across report runs
+_report_executor: Optional[ProcessPoolExecutor] = None
+_report_executor_lock = threading.Lock()
+
 class ExcelReportGenerator(IReportGenerator):
     """Excel report generator implementation."""
     
     def __init__(self):
         self.logger = logging.getLogger("CoreAnalytics")
     
-    def generate_report(self, data: LogsQueryResult, filepath: str, report_type: str) -> None:
-        """Generate an Excel report from log data."""
+    def generate_report(self, data: LogsQueryResult, filepath: str, report_type: str) -> Optional[pd.DataFrame]:
+        """Generate an Excel report from log data. Stroke count reports return their daily counts."""
         try:
             if report_type == "user_count":
-                generate_user_count_excel(data, filepath)
+                report_data = generate_user_count_excel(data, filepath)
             elif report_type == "stroke_count":
-                generate_stroke_count_excel(data, filepath)
+                report_data = generate_stroke_count_excel(data, filepath)
             else:
                 raise ReportGenerationError(f"Unknown report type: {report_type}")
                 
             self.logger.info(f"Generated {report_type} report: {filepath}")
+            return report_data
             
         except Exception as e:
             self.logger.error(f"Failed to generate {report_type} report at {filepath}: {e}")
             raise ReportGenerationError(f"Failed to generate report: {e}")
 
+def _generate_report_in_worker(data: LogsQueryResult, filepath: str, report_type: str) -> Optional[pd.DataFrame]:
+    """Entry point for report worker processes (module level so it can be pickled)."""
+    return ExcelReportGenerator().generate_report(data=data, filepath=filepath, report_type=report_type)
+
+def _get_report_executor() -> ProcessPoolExecutor:
+    """Return the shared report worker pool.
+    
+    Workers are started with spawn: the server process already runs scheduler, HTTP and Azure SDK threads,
+    and forking a multi-threaded process can deadlock the child.
+    """
+    global _report_executor
+    if _report_executor is None:
+        with _report_executor_lock:
+            if _report_executor is None:
+                _report_executor = ProcessPoolExecutor(
+                    max_workers=MAX_REPORT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _report_executor
+
+def _discard_report_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken worker pool so the next run starts a fresh one."""
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is executor:
+            _report_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
 class ReportFactory:
     """Factory for creating and managing reports."""
     
     def __init__(self):
         self.logger = logging.getLogger("CoreAnalytics")
         self.excel_generator = ExcelReportGenerator()
+        # 打鍵数レポートで集計した日別打鍵数（サマリー作成時にファイルを読み直さないよう保持する）
+        self._daily_stroke_counts: Dict[str, pd.DataFrame] = {}
+    
+    def _generate_reports(self, 
+                          results: Dict[str, Dict[str, Any]], 
+                          output_dir: Path, 
+                          end_time: datetime, 
+                          report_type: str) -> Dict[str, Dict[str, Any]]:
+        """Generate one report per query key, in parallel processes when there is more than one.
+        
+        Returns {query_key: {"filepath": ..., "report_data": ...}} for the reports that succeeded, in query order.
+        """
+        filepaths = {
+            query_key: str(output_dir / f"{query_key}_{end_time.strftime('%Y%m%d')}.xlsx")
+            for query_key in results
+        }
+        generated = {}
+        
+        if len(results) <= 1:
+            for query_key, result in results.items():
+                try:
+                    report_data = self.excel_generator.generate_report(
+                        data=result["data"],
+                        filepath=filepaths[query_key],
+                        report_type=report_type
+                    )
+                    generated[query_key] = {"filepath": filepaths[query_key], "report_data": report_data}
+                except Exception as e:
+                    self.logger.error(f"Failed to generate {report_type} report for {query_key}: {e}")
+            return generated
+        
+        executor = _get_report_executor()
+        futures = {
+            query_key: executor.submit(_generate_report_in_worker, result["data"], filepaths[query_key], report_type)
+            for query_key, result in results.items()
+        }
+        for query_key, future in futures.items():
+            try:
+                generated[query_key] = {"filepath": filepaths[query_key], "report_data": future.result()}
+                self.logger.info(f"Generated {report_type} report: {filepaths[query_key]}")
+            except BrokenProcessPool as e:
+                self.logger.error(f"Report worker pool failed while generating {report_type} report for {query_key}: {e}")
+                _discard_report_executor(executor)
+            except Exception as e:
+                self.logger.error(f"Failed to generate {report_type} report for {query_key}: {e}")
+        
+        return generated
     
     def generate_user_count_reports(self, 
                                   processed_data: ProcessData, 
                                   output_dir: Path, 
                                   end_time: datetime) -> List[str]:
         """Generate all user count reports."""
-        generated_files = []
         user_count_results = processed_data.user_count_results
 
         self.logger.info(f"Generating {len(user_count_results)} user count reports")
         
-        for query_key, result in user_count_results.items():
-            try:
-                filepath = output_dir / f"{query_key}_{end_time.strftime('%Y%m%d')}.xlsx"
-                self.excel_generator.generate_report(
-                    data=result["data"],
-                    filepath=str(filepath),
-                    report_type="user_count"
-                )
-                generated_files.append(str(filepath))
-                
-            except Exception as e:
-                self.logger.error(f"Failed to generate user count report for {query_key}: {e}")
-                continue
-        
-        return generated_files
+        generated = self._generate_reports(user_count_results, output_dir, end_time, "user_count")
+        return [report["filepath"] for report in generated.values()]
     
     def generate_stroke_count_reports(self, 
                                     processed_data: ProcessData, 
                                     output_dir: Path, 
                                     end_time: datetime) -> List[str]:
         """Generate all stroke count reports."""
-        generated_files = []
         stroke_count_results = processed_data.stroke_count_results
         
         self.logger.info(f"Generating {len(stroke_count_results)} stroke count reports")
         
-        for query_key, result in stroke_count_results.items():
-            try:
-                filepath = output_dir / f"{query_key}_{end_time.strftime('%Y%m%d')}.xlsx"
-                self.excel_generator.generate_report(
-                    data=result["data"],
-                    filepath=str(filepath),
-                    report_type="stroke_count"
-                )
-                generated_files.append(str(filepath))
-                
-            except Exception as e:
-                self.logger.error(f"Failed to generate stroke count report for {query_key}: {e}")
-                continue
-        
-        return generated_files
+        generated = self._generate_reports(stroke_count_results, output_dir, end_time, "stroke_count")
+        self._daily_stroke_counts = {
+            query_key: report["report_data"] for query_key, report in generated.items()
+        }
+        return [report["filepath"] for report in generated.values()]
     
     def generate_stroke_count_summary(self, 
                                   processed_data: ProcessData, 
@@ -105,28 +172,32 @@ class ReportFactory:
         
         self.logger.info(f"Updating stroke count summary for {len(stroke_count_results)} queries")
         
-        for query_key, result in stroke_count_results.items():
-            try:
-                filepath = stroke_count_dir / f"{query_key}_{end_time.strftime('%Y%m%d')}.xlsx"
-                
-                from core_analytics.view.excel_utils import _read_stroke_count_excel_to_df
-                df = _read_stroke_count_excel_to_df(sheet_name="打鍵数", filepath=filepath)
-                generate_stroke_count_summary_excel(
-                    datas=df,
-                    filepath=str(stroke_count_dir),
-                    sheet_name=query_key
-                )
-            except Exception as e:
-                self.logger.error(f"Failed to update stroke count summary for {query_key}: {e}")
-                continue
-        
-        # add_bar_graph_to_stroke_count_excel(
-        #             folder_path=str(stroke_count_dir)
-        #         )
+        # stroke_count.xlsx は1回だけ読み込み、全クエリ分の追記とグラフ作成の後に1回だけ保存する
+        with stroke_count_workbook(str(stroke_count_dir)) as wb:
+            for query_key, result in stroke_count_results.items():
+                try:
+                    df = self._daily_stroke_counts.get(query_key)
+                    if df is None:
+                        raise ReportGenerationError(f"No daily stroke counts were generated for {query_key}")
+                    generate_stroke_count_summary_excel(
+                        datas=df,
+                        filepath=str(stroke_count_dir),
+                        sheet_name=query_key,
+                        wb=wb
+                    )
+                except Exception as e:
+                    self.logger.error(f"Failed to update stroke count summary for {query_key}: {e}")
+                    continue
+            
+            # add_bar_graph_to_stroke_count_excel(
+            #             folder_path=str(stroke_count_dir),
+            #             wb=wb
+            #         )
 
-        stroke_count_summary_files = create_line_graph(
-            folder_path=str(stroke_count_dir)
-        )
+            stroke_count_summary_files = create_line_graph(
+                folder_path=str(stroke_count_dir),
+                wb=wb
+            )
         return stroke_count_summary_files
     
     def generate_all_reports(self, 
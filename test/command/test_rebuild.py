@@ -9,6 +9,7 @@ from __future__ import annotations
 
 import os
 import sys
+from dataclasses import replace
 from pathlib import Path
 from typing import List
 
@@ -26,6 +27,7 @@ from core_analytics.command.rebuild import (
     parse_date,
     generate_date_range,
     initialize_usage_report_from_template,
+    prepare_history_directories,
     process_single_day,
 )
 
@@ -37,7 +39,7 @@ def _ensure_output_base_dir(config_service: ConfigurationService, output_dir: Pa
     app_settings = config_service.get_app_settings()
     if output_dir is not None:
         output_dir.mkdir(parents=True, exist_ok=True)
-        app_settings.output_base_dir = str(output_dir)
+        app_settings = replace(app_settings, output_base_dir=str(output_dir))
         config_service._app_settings = app_settings  # type: ignore[attr-defined]
         return output_dir
 
@@ -81,6 +83,7 @@ def test_rebuild(rebuild_from: str, rebuild_to: str, output_dir: Path | None = N
         raise FileNotFoundError(f"Template file not found: {template_path}")
 
     initialize_usage_report_from_template(template_path, usage_report_path)
+    prepare_history_directories(date_range)
 
     generated_files: List[str] = []
 
@@ -23,7 +23,7 @@ class TestAzureBlobRepository(unittest.TestCase):
         self.repository = AzureBlobRepository(self.config_service)
 
     @patch.dict(os.environ, {"AZURE_BLOB_CONNECTION_STRING": "test_connection_string"})
-    @patch("model.repositories.azure_blob_repository.BlobServiceClient")
+    @patch("azure.storage.blob.BlobServiceClient")
     def test_blob_service_client_initialization(self, mock_blob_service_client):
         """Test blob service client initialization with connection string."""
         mock_client = Mock()
@@ -34,7 +34,7 @@ class TestAzureBlobRepository(unittest.TestCase):
         mock_blob_service_client.from_connection_string.assert_called_once_with("test_connection_string")
         self.assertEqual(client, mock_client)
 
-    @patch("model.repositories.azure_blob_repository.BlobServiceClient")
+    @patch("azure.storage.blob.BlobServiceClient")
     def test_upload_file_success(self, mock_blob_service_client):
         """Test successful file upload."""
         # Create temporary test file
@@ -59,7 +59,7 @@ class TestAzureBlobRepository(unittest.TestCase):
             if os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
 
-    @patch("model.repositories.azure_blob_repository.BlobServiceClient")
+    @patch("azure.storage.blob.BlobServiceClient")
     def test_upload_file_not_found(self, mock_blob_service_client):
         """Test upload with non-existent file."""
         with patch.dict(os.environ, {"AZURE_BLOB_CONNECTION_STRING": "test_connection"}):
@@ -68,13 +68,12 @@ class TestAzureBlobRepository(unittest.TestCase):
             
             self.assertIn("Local file not found", str(context.exception))
 
-    @patch("model.repositories.azure_blob_repository.BlobServiceClient")
+    @patch("azure.storage.blob.BlobServiceClient")
     def test_download_file_success(self, mock_blob_service_client):
         """Test successful file download."""
         mock_service_client = Mock()
         mock_blob_client = Mock()
         mock_download_stream = Mock()
-        mock_download_stream.readall.return_value = b"downloaded content"
         mock_blob_client.download_blob.return_value = mock_download_stream
         mock_service_client.get_blob_client.return_value = mock_blob_client
         mock_blob_service_client.from_connection_string.return_value = mock_service_client
@@ -87,6 +86,7 @@ class TestAzureBlobRepository(unittest.TestCase):
                 result = self.repository.download_file("remote_file.txt", temp_file_path)
                 
                 mock_blob_client.download_blob.assert_called_once()
+                mock_download_stream.readinto.assert_called_once()
                 self.assertTrue(result)
         
         finally:
@@ -7,6 +7,7 @@ import tempfile
 import shutil
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 from model.repositories.file_repository import FileRepository
 
@@ -215,6 +216,46 @@ class TestFileRepository(unittest.TestCase):
         # Should be 0
         self.assertEqual(size, 0)
 
+    def test_get_directory_size_skips_entries_removed_during_scan(self):
+        """Test that an entry deleted while the directory is scanned is skipped instead of zeroing the total."""
+        test_dir = os.path.join(self.test_dir, "vanishing_test")
+        sub_dir = os.path.join(test_dir, "sub")
+        os.makedirs(sub_dir)
+        
+        with open(os.path.join(test_dir, "kept.txt"), 'w') as f:
+            f.write("Hello World")  # 11 bytes
+        with open(os.path.join(sub_dir, "nested.txt"), 'w') as f:
+            f.write("Test Content")  # 12 bytes
+        with open(os.path.join(test_dir, "vanishing.txt"), 'w') as f:
+            f.write("removed before stat")
+        os.makedirs(os.path.join(test_dir, "vanishing_dir"))
+        
+        real_scandir = os.scandir
+        
+        class VanishingScandir:
+            """Delete vanishing entries after they are listed, as a concurrent cleanup would."""
+            def __init__(self, path):
+                self._entries = real_scandir(path)
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc_info):
+                self._entries.close()
+            
+            def __iter__(self):
+                for entry in self._entries:
+                    if entry.name == "vanishing.txt":
+                        os.remove(entry.path)
+                    elif entry.name == "vanishing_dir":
+                        os.rmdir(entry.path)
+                    yield entry
+        
+        with patch("model.repositories.file_repository.os.scandir", VanishingScandir):
+            total_size = self.repository.get_directory_size(test_dir)
+        
+        self.assertEqual(total_size, 23)
+
     def test_directory_exists(self):
         """Test checking if directory exists."""
         # Create test directory
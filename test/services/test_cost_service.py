@@ -0,0 +1,184 @@
+"""
+Unit tests for AzureCostService.
+"""
+import os
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from services.cost_service import AzureCostService
+
+SCOPE = "/subscriptions/sub-1"
+BATCH_URL = "https://management.azure.com/batch?api-version=2020-06-01"
+QUERY_URL = f"https://management.azure.com{SCOPE}/providers/Microsoft.CostManagement/query?api-version=2023-03-01"
+NEXT_LINK = f"{QUERY_URL}&$skiptoken=page2"
+
+APP_ENV = {
+    "AZURE_SUBSCRIPTION_ID": "sub-1",
+    "APP1_NAME": "app-one",
+    "APP1_RESOURCE_GROUP": "rg-one",
+    "APP2_NAME": "app-two",
+    "APP2_COST_TAG_NAME": "app",
+    "APP2_COST_TAG_VALUES": "two, two-dev",
+}
+
+
+def _response(body, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.text = str(body)
+    response.json.return_value = body
+    return response
+
+
+def _query_content(rows, next_link=None):
+    properties = {"rows": rows}
+    if next_link:
+        properties["nextLink"] = next_link
+    return {"properties": properties}
+
+
+class TestAzureCostService(unittest.TestCase):
+    """Test cases for AzureCostService with mocked ARM responses."""
+
+    def setUp(self):
+        """Test setup."""
+        credential = Mock()
+        credential.get_token.return_value = Mock(token="token", expires_on=time.time() + 3600)
+
+        with patch("services.cost_service.get_default_credential", return_value=credential):
+            self.service = AzureCostService()
+        self.service._session = Mock()
+
+    def _route(self, responses_by_url):
+        """Answer each POST from the queue registered for its URL."""
+        def post(url, json, headers, timeout):
+            return responses_by_url[url].pop(0)
+        self.service._session.post.side_effect = post
+
+    def test_get_apps_mtd_costs_uses_one_batch_request(self):
+        """Test that every app is answered by a single ARM batch request."""
+        self._route({
+            BATCH_URL: [_response({"responses": [
+                {"name": "0", "httpStatusCode": 200, "content": _query_content([[10.5, "JPY"]])},
+                {"name": "1", "httpStatusCode": 200, "content": _query_content([[2.0, "JPY"], [3.0, "JPY"]])},
+            ]})],
+        })
+
+        with patch.dict(os.environ, APP_ENV, clear=True):
+            costs = self.service.get_apps_mtd_costs()
+
+        self.assertEqual(costs, {"app-one": 10.5, "app-two": 5.0})
+        self.service._session.post.assert_called_once()
+
+        body = self.service._session.post.call_args.kwargs["json"]
+        self.assertEqual([request["name"] for request in body["requests"]], ["0", "1"])
+        self.assertEqual(
+            body["requests"][0]["content"]["dataset"]["filter"],
+            {"dimensions": {"name": "ResourceGroupName", "operator": "In", "values": ["rg-one"]}}
+        )
+        self.assertEqual(
+            body["requests"][1]["content"]["dataset"]["filter"],
+            {"tags": {"name": "app", "operator": "In", "values": ["two", "two-dev"]}}
+        )
+
+    def test_failed_batch_entry_falls_back_to_individual_query(self):
+        """Test that an app whose batch entry failed is queried on its own."""
+        self._route({
+            BATCH_URL: [_response({"responses": [
+                {"name": "0", "httpStatusCode": 200, "content": _query_content([[10.5, "JPY"]])},
+                {"name": "1", "httpStatusCode": 429, "content": {"error": {"code": "TooManyRequests"}}},
+            ]})],
+            QUERY_URL: [_response(_query_content([[7.25, "JPY"]]))],
+        })
+
+        with patch.dict(os.environ, APP_ENV, clear=True):
+            costs = self.service.get_apps_mtd_costs()
+
+        self.assertEqual(costs, {"app-one": 10.5, "app-two": 7.25})
+        self.assertEqual(self.service._session.post.call_count, 2)
+        individual_payload = self.service._session.post.call_args.kwargs["json"]
+        self.assertEqual(individual_payload["dataset"]["filter"]["tags"]["values"], ["two", "two-dev"])
+
+    def test_accepted_batch_entry_falls_back_to_individual_query(self):
+        """Test that a 202 Accepted entry without a body is queried on its own instead of counted as 0."""
+        self._route({
+            BATCH_URL: [_response({"responses": [
+                {"name": "0", "httpStatusCode": 200, "content": _query_content([[10.5, "JPY"]])},
+                {"name": "1", "httpStatusCode": 202},
+            ]})],
+            QUERY_URL: [_response(_query_content([[7.25, "JPY"]]))],
+        })
+
+        with patch.dict(os.environ, APP_ENV, clear=True):
+            costs = self.service.get_apps_mtd_costs()
+
+        self.assertEqual(costs, {"app-one": 10.5, "app-two": 7.25})
+        self.assertEqual(self.service._session.post.call_count, 2)
+
+    def test_batch_entry_without_rows_is_left_for_individual_query(self):
+        """Test that a 200 entry with empty content is not reported as a cost."""
+        self._route({
+            BATCH_URL: [_response({"responses": [
+                {"name": "0", "httpStatusCode": 200, "content": {}},
+                {"name": "1", "httpStatusCode": 200, "content": _query_content([])},
+            ]})],
+        })
+
+        costs = self.service.query_mtd_cost_batch(SCOPE, {
+            "app-one": {"dimension_name": "ResourceGroupName", "dimension_values": ["rg-one"]},
+            "app-two": {"tag_name": "app", "tag_values": ["two"]},
+        })
+
+        self.assertEqual(costs, {})
+
+    def test_failed_batch_request_falls_back_to_individual_queries(self):
+        """Test that every app is queried individually when the batch request itself fails."""
+        self._route({
+            BATCH_URL: [_response({"error": "unavailable"}, status_code=503)],
+            QUERY_URL: [_response(_query_content([[1.0, "JPY"]])), _response(_query_content([[2.0, "JPY"]]))],
+        })
+
+        with patch.dict(os.environ, APP_ENV, clear=True):
+            costs = self.service.get_apps_mtd_costs()
+
+        self.assertEqual(sorted(costs), ["app-one", "app-two"])
+        self.assertEqual(sorted(costs.values()), [1.0, 2.0])
+        self.assertEqual(self.service._session.post.call_count, 3)
+
+    def test_query_mtd_cost_follows_next_link(self):
+        """Test that every page behind nextLink is read and summed."""
+        self._route({
+            QUERY_URL: [_response(_query_content([[1.0, "JPY"], [2.0, "JPY"]], next_link=NEXT_LINK))],
+            NEXT_LINK: [_response(_query_content([[4.0, "JPY"]]))],
+        })
+
+        total = self.service.query_mtd_cost(SCOPE, dimension_name="ResourceGroupName", dimension_values=["rg-one"])
+
+        self.assertEqual(total, 7.0)
+        self.assertEqual(self.service._session.post.call_count, 2)
+        # 次ページも同じクエリ本文で問い合わせる
+        first_payload, next_payload = [call.kwargs["json"] for call in self.service._session.post.call_args_list]
+        self.assertEqual(first_payload, next_payload)
+
+    def test_batch_entry_follows_next_link(self):
+        """Test that a batch entry with a nextLink has its remaining pages read."""
+        self._route({
+            BATCH_URL: [_response({"responses": [
+                {"name": "0", "httpStatusCode": 200, "content": _query_content([[1.5, "JPY"]], next_link=NEXT_LINK)},
+            ]})],
+            NEXT_LINK: [_response(_query_content([[2.5, "JPY"]]))],
+        })
+
+        costs = self.service.query_mtd_cost_batch(SCOPE, {"app-one": {"dimension_name": "ResourceGroupName", "dimension_values": ["rg-one"]}})
+
+        self.assertEqual(costs, {"app-one": 4.0})
+
+
+def main():
+    """Run the tests."""
+    unittest.main(verbosity=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -242,6 +242,61 @@ class TestFileCleanupService(unittest.TestCase):
             result = self.service._format_size(size_bytes)
             self.assertEqual(result, expected)
 
+    def test_format_size_unit_boundaries(self):
+        """Test that the unit switches exactly at each power of 1024."""
+        test_cases = [
+            (1, "1.0 B"),
+            (1023, "1023.0 B"),
+            (1024, "1.0 KB"),
+            (1024 ** 2 - 1, "1024.0 KB"),
+            (1024 ** 2, "1.0 MB"),
+            (1024 ** 3 - 1, "1024.0 MB"),
+            (1024 ** 3, "1.0 GB"),
+            (1024 ** 4 - 1, "1024.0 GB"),
+            (1024 ** 4, "1.0 TB"),
+            # TB より大きい単位はないため TB のまま表示する
+            (1024 ** 5, "1024.0 TB"),
+        ]
+
+        for size_bytes, expected in test_cases:
+            with self.subTest(size_bytes=size_bytes):
+                self.assertEqual(self.service._format_size(size_bytes), expected)
+
+    def test_scan_candidates_splits_by_cutoff_and_sizes(self):
+        """Test splitting directories by the cutoff date and the sizes returned with them."""
+        cutoff_date = datetime(2024, 2, 1)
+        old_dir = {'path': "output/20240101", 'name': '20240101', 'date': datetime(2024, 1, 1)}
+        cutoff_dir = {'path': "output/20240201", 'name': '20240201', 'date': datetime(2024, 2, 1)}
+        recent_dir = {'path': "output/20240220", 'name': '20240220', 'date': datetime(2024, 2, 20)}
+        sizes = {old_dir['path']: 2048, cutoff_dir['path']: 512, recent_dir['path']: 1024}
+
+        self.mock_file_repository.get_directory_sizes_bulk.side_effect = lambda paths: {path: sizes[path] for path in paths}
+
+        with patch.object(self.service, '_get_date_based_directories', return_value=[old_dir, cutoff_dir, recent_dir]):
+            to_delete, to_keep, directory_sizes = self.service._scan_candidates("output", cutoff_date)
+
+        # カットオフ日当日のディレクトリは残す
+        self.assertEqual(to_delete, [old_dir])
+        self.assertEqual(to_keep, [cutoff_dir, recent_dir])
+        self.assertEqual(directory_sizes, sizes)
+        self.assertEqual(sum(directory_sizes[info['path']] for info in to_delete), 2048)
+
+    def test_scan_candidates_without_kept_sizes(self):
+        """Test that only directories due for deletion are sized when size_kept is False."""
+        cutoff_date = datetime(2024, 2, 1)
+        old_dir = {'path': "output/20240101", 'name': '20240101', 'date': datetime(2024, 1, 1)}
+        recent_dir = {'path': "output/20240220", 'name': '20240220', 'date': datetime(2024, 2, 20)}
+
+        self.mock_file_repository.get_directory_sizes_bulk.return_value = {old_dir['path']: 2048}
+
+        with patch.object(self.service, '_get_date_based_directories', return_value=[old_dir, recent_dir]):
+            to_delete, to_keep, directory_sizes = self.service._scan_candidates("output", cutoff_date, size_kept=False)
+
+        self.assertEqual(to_delete, [old_dir])
+        self.assertEqual(to_keep, [recent_dir])
+        self.assertEqual(directory_sizes, {old_dir['path']: 2048})
+        self.mock_file_repository.get_directory_sizes_bulk.assert_called_once_with([old_dir['path']])
+
     def test_cleanup_failure_handling(self):
         """Test handling of deletion failures."""
         # Setup mock directory
@@ -0,0 +1,83 @@
+"""
+Unit tests for QueryStrategyFactory.
+"""
+import unittest
+from unittest.mock import Mock, patch
+
+from core.interfaces import IQueryStrategy
+from services.query_strategies.strategy_factory import QueryStrategyFactory
+from services.query_strategies.user_count_strategy import UserCountStrategy
+from services.query_strategies.stroke_count_strategy import StrokeCountStrategy
+
+
+class TestQueryStrategyFactory(unittest.TestCase):
+    """Test cases for QueryStrategyFactory lookups and their memoization."""
+
+    def setUp(self):
+        """Test setup."""
+        self.factory = QueryStrategyFactory()
+
+    def test_repeated_lookup_returns_same_instance(self):
+        """Test that looking up the same key twice returns the same strategy without resolving it again."""
+        with patch.object(self.factory, '_find_strategy', wraps=self.factory._find_strategy) as mock_find:
+            first = self.factory.get_strategy("daily_user_count")
+            second = self.factory.get_strategy("daily_user_count")
+
+        self.assertIsInstance(first, UserCountStrategy)
+        self.assertIs(first, second)
+        mock_find.assert_called_once_with("daily_user_count")
+
+    def test_keys_are_memoized_separately(self):
+        """Test that each query key is resolved and cached on its own."""
+        with patch.object(self.factory, '_find_strategy', wraps=self.factory._find_strategy) as mock_find:
+            user_count = self.factory.get_strategy("daily_user_count")
+            stroke_count = self.factory.get_strategy("daily_stroke_count")
+            other_user_count = self.factory.get_strategy("monthly_user_count")
+
+            self.assertIs(self.factory.get_strategy("daily_user_count"), user_count)
+            self.assertIs(self.factory.get_strategy("daily_stroke_count"), stroke_count)
+
+        self.assertIsInstance(user_count, UserCountStrategy)
+        self.assertIsInstance(stroke_count, StrokeCountStrategy)
+        # 同じ戦略に解決されるキーでも、キーごとに判定される
+        self.assertIs(other_user_count, user_count)
+        self.assertEqual(
+            [call.args[0] for call in mock_find.call_args_list],
+            ["daily_user_count", "daily_stroke_count", "monthly_user_count"]
+        )
+
+    def test_missing_strategy_is_memoized(self):
+        """Test that a key without a strategy is cached as None."""
+        with patch.object(self.factory, '_find_strategy', wraps=self.factory._find_strategy) as mock_find:
+            self.assertIsNone(self.factory.get_strategy("daily_alm_chat_history"))
+            self.assertIsNone(self.factory.get_strategy("daily_alm_chat_history"))
+
+        mock_find.assert_called_once_with("daily_alm_chat_history")
+
+    def test_register_strategy_clears_memoized_lookups(self):
+        """Test that registering a strategy makes previously missing keys resolvable."""
+        self.assertIsNone(self.factory.get_strategy("daily_alm_chat_history"))
+
+        strategy = Mock(spec=IQueryStrategy)
+        strategy.can_handle.side_effect = lambda query_key: "alm_chat" in query_key
+        self.factory.register_strategy(strategy)
+
+        self.assertIs(self.factory.get_strategy("daily_alm_chat_history"), strategy)
+        self.assertIsInstance(self.factory.get_strategy("daily_user_count"), UserCountStrategy)
+
+    def test_register_strategy_with_token(self):
+        """Test that a strategy registered with a token is dispatched by that substring."""
+        strategy = Mock(spec=IQueryStrategy)
+        self.factory.register_strategy(strategy, token="alm_chat")
+
+        self.assertIs(self.factory.get_strategy("daily_alm_chat_history"), strategy)
+        strategy.can_handle.assert_not_called()
+
+
+def main():
+    """Run the tests."""
+    unittest.main(verbosity=2)
+
+
+if __name__ == "__main__":
+    main()
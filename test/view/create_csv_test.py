@@ -0,0 +1,115 @@
+import builtins
+import codecs
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from view.csv_utils import create_csv
+
+
+class MockTable:
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+class MockLogsQueryResult:
+    def __init__(self, tables):
+        self.tables = tables
+
+
+def _codec(encoding):
+    # "ANSI" は Windows でのみ使えるコーデック名のため、それ以外では日本語の ANSI コードページで代用する
+    try:
+        codecs.lookup(encoding)
+        return encoding
+    except LookupError:
+        return "cp932"
+
+
+class TestCreateCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output_path = os.path.join(self.tmp_dir.name, "result.csv")
+
+    def _open(self, path, mode="r", encoding=None, **kwargs):
+        return builtins.open(self.output_path, mode, encoding=_codec(encoding), **kwargs)
+
+    def _create_csv(self, columns, rows) -> bytes:
+        with patch("view.csv_utils.open", self._open, create=True):
+            create_csv(MockLogsQueryResult([MockTable(columns, rows)]))
+        with builtins.open(self.output_path, "rb") as f:
+            return f.read()
+
+    def _csv_writer_output(self, columns, rows) -> bytes:
+        # 高速化前の create_csv と同じ書き出し方
+        expected_path = os.path.join(self.tmp_dir.name, "expected.csv")
+        with builtins.open(expected_path, "w", encoding=_codec("ANSI"), newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+        with builtins.open(expected_path, "rb") as f:
+            return f.read()
+
+    def test_plain_values_match_csv_writer(self):
+        columns = ["TimeGenerated", "DisplayName", "Department", "Count", "Score"]
+        rows = [
+            [datetime(2025, 1, 1, 9, 30), "辛 ジャスティン", "市統E", 3, 1.5],
+            [datetime(2025, 1, 2, 10, 0), "テスト ユーザー6", None, 0, None],
+            [None, "", "市統F", -1, 2.25],
+        ]
+
+        self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+    def test_values_needing_quotes_match_csv_writer(self):
+        columns = ["DisplayName", "Comment", "Count"]
+        rows = [
+            ["ユーザー1", "plain", 1],
+            ["ユーザー2", "a,b", None],
+            ["ユーザー3", 'say "hi"', 3],
+            ["ユーザー4", "line1\nline2", 4],
+            ["ユーザー5", "line1\r\nline2", 5],
+        ]
+
+        self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+    def test_header_needing_quotes_matches_csv_writer(self):
+        columns = ["Name, Department", "Count"]
+        rows = [["ユーザー1", 1], ["ユーザー2", 2]]
+
+        self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+    def test_non_str_values_containing_commas_match_csv_writer(self):
+        # 動的列の dict / list は str() にするとカンマを含むため、クォートしないと列がずれる
+        columns = ["DisplayName", "Properties", "Tags"]
+        rows = [
+            ["ユーザー1", {'a': 1, 'b': 2}, ["x", "y"]],
+            ["ユーザー2", {}, []],
+        ]
+
+        self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+    def test_single_empty_value_rows_match_csv_writer(self):
+        # 値1つだけの空行は空行と区別するため "" と書き出される
+        columns = ["DisplayName"]
+        rows = [["ユーザー1"], [""], [None], ["ユーザー2"]]
+
+        self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+    def test_nan_matches_csv_writer(self):
+        columns = ["DisplayName", "Score"]
+        plain_rows = [["ユーザー1", float("nan")], ["ユーザー2", None]]
+        quoted_rows = plain_rows + [["ユーザー3, ユーザー4", 1.5]]
+
+        for rows in (plain_rows, quoted_rows):
+            with self.subTest(rows=rows):
+                self.assertEqual(self._create_csv(columns, rows), self._csv_writer_output(columns, rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import math
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+import openpyxl
+from core.models import ProcessData, RESULT_TYPES
+from view.factories.daily_monitor_factory import DailyMonitorFactory
+
+
+class MockTable:
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+class MockLogsQueryResult:
+    def __init__(self, tables):
+        self.tables = tables
+
+
+class TestFillHistoryTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = DailyMonitorFactory()
+        self.factory.template_dir = Path(__file__).resolve().parents[2] / "config" / "report_template"
+
+    def test_null_timestamp_and_nan_are_written_as_empty_cells(self):
+        columns = ["TimeGenerated", "user", "score"]
+        rows = [
+            [datetime(2025, 1, 1, tzinfo=timezone.utc), "u1", 1.5],
+            [None, "u2", math.nan],
+            [datetime(2025, 1, 2, tzinfo=timezone.utc), "u3", 3.0],
+        ]
+        results = {result_type: {} for result_type in RESULT_TYPES}
+        results["unknown"]["daily_alm_chat_history"] = {
+            "data": MockLogsQueryResult([MockTable(columns, rows)])
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "history.xlsx")
+            self.factory._fill_history_template_with_data(filepath, ProcessData(results=results))
+
+            wb = openpyxl.load_workbook(filepath)
+            values = list(wb["外貨ALM-Chat"].iter_rows(min_row=2, max_col=3, values_only=True))
+            wb.close()
+
+        # 途中の行に NaT / NaN があっても、後続の行を含めて全行が書き込まれる（日時は JST）
+        self.assertEqual(values, [
+            (datetime(2025, 1, 1, 9, 0), "u1", 1.5),
+            (None, "u2", None),
+            (datetime(2025, 1, 2, 9, 0), "u3", 3.0),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import math
+import os
+import tempfile
+import unittest
+
+import openpyxl
+from view.excel_utils import generate_user_count_excel
+
+
+class MockTable:
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+class MockLogsQueryResult:
+    def __init__(self, tables):
+        self.tables = tables
+
+
+class TestWriteNonFiniteValues(unittest.TestCase):
+
+    def test_generate_user_count_excel_with_nan_and_inf(self):
+        columns = ["DisplayName", "Department", "Score"]
+        rows = [
+            ["ユーザー1", "市統E", 1.5],
+            ["ユーザー2", "市統E", math.nan],
+            ["ユーザー3", None, math.inf],
+            ["ユーザー4", "市統F", -math.inf],
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "user_count.xlsx")
+            generate_user_count_excel(MockLogsQueryResult([MockTable(columns, rows)]), filepath)
+
+            wb = openpyxl.load_workbook(filepath)
+            values = list(wb["result"].iter_rows(values_only=True))
+            wb.close()
+
+        # NaN / None は空セル、±inf は to_excel と同じく文字列で書き込まれる
+        self.assertEqual(values, [
+            ("DisplayName", "Department", "Score"),
+            ("ユーザー1", "市統E", 1.5),
+            ("ユーザー2", "市統E", None),
+            ("ユーザー3", None, "inf"),
+            ("ユーザー4", "市統F", "-inf"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()